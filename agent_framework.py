@@ -275,7 +275,8 @@ def run_debate(client, context: dict, agent_config: dict = None,
         client:         Anthropic API client
         context:        Shared context dict with keys:
                           - symbol, timeframe_label
-                          - screenshot_b64 (base64 PNG or None)
+                          - screenshot_b64 (base64 image or None)
+                          - screenshot_media_type (e.g. "image/jpeg"; default "image/png")
                           - l1_scores (dict from technical_calculator, or empty)
                           - indicator_snapshot (raw indicator values, or empty)
         agent_config:   Agent configuration (from resolve_agent_config)
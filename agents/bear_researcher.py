@@ -144,7 +144,9 @@ def run_bear_researcher(client, context: dict, model: str,
     if image_b64:
         content.append({
             "type": "image",
-            "source": {"type": "base64", "media_type": "image/png", "data": image_b64}
+            "source": {"type": "base64",
+                       "media_type": context.get("screenshot_media_type", "image/png"),
+                       "data": image_b64}
         })
     content.append({"type": "text", "text": prompt})
 
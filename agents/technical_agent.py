@@ -150,7 +150,9 @@ def run_technical_agent(client, context: dict, model: str) -> dict:
     if image_b64:
         content.append({
             "type": "image",
-            "source": {"type": "base64", "media_type": "image/png", "data": image_b64}
+            "source": {"type": "base64",
+                       "media_type": context.get("screenshot_media_type", "image/png"),
+                       "data": image_b64}
         })
     content.append({"type": "text", "text": prompt})
 
@@ -25,36 +25,42 @@ SYMBOL_DATABASES = {
         'name': 'Gold Futures',
         'symbol': 'XAUUSD.sim',
         'db_path': os.path.join(BASE_DIR, 'XAUJ26_intelligence.db'),
+        'digits': 2,  # Price precision (decimal places)
     },
     'USOIL': {
         'id': 'USOIL',
         'name': 'Crude Oil',
         'symbol': 'USOIL.sim',
         'db_path': os.path.join(BASE_DIR, 'USOIL_intelligence.db'),
+        'digits': 3,  # Price precision (decimal places)
     },
     'US500': {
         'id': 'US500',
         'name': 'S&P 500',
         'symbol': 'US500.sim',
         'db_path': os.path.join(BASE_DIR, 'US500_intelligence.db'),
+        'digits': 2,  # Price precision (decimal places)
     },
     'US100': {
         'id': 'US100',
         'name': 'Nasdaq 100',
         'symbol': 'US100.sim',
         'db_path': os.path.join(BASE_DIR, 'US100_intelligence.db'),
+        'digits': 2,  # Price precision (decimal places)
     },
     'US30': {
         'id': 'US30',
         'name': 'Dow Jones',
         'symbol': 'US30.sim',
         'db_path': os.path.join(BASE_DIR, 'US30_intelligence.db'),
+        'digits': 2,  # Price precision (decimal places)
     },
     'BTCUSD': {
         'id': 'BTCUSD',
         'name': 'Bitcoin',
         'symbol': 'BTCUSD.sim',
         'db_path': os.path.join(BASE_DIR, 'BTCUSD_intelligence.db'),
+        'digits': 2,  # Price precision (decimal places)
     }
 }
 
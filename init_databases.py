@@ -231,6 +231,11 @@ def create_symbol_database_schema(conn):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_fibonacci_timestamp ON fibonacci_data(timestamp)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_ath_timestamp ON ath_tracking(timestamp)')
     
+    # Composite indexes for the API's "WHERE timeframe = ? ORDER BY timestamp DESC LIMIT ?"
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_adv_tf_ts ON advanced_indicators(timeframe, timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_fib_tf_ts ON fibonacci_data(timeframe, timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ath_tf_ts ON ath_tracking(timeframe, timestamp DESC)')
+    
     conn.commit()
     print(f"    - Created 5 tables with indexes")
 
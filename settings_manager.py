@@ -6,10 +6,65 @@ V11.2 - Centralized configuration management
 
 import sqlite3
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 
 
+class PreparedStatementCache:
+    """
+    Long-lived connection wrapper that keeps compiled SQL statements around.
+    sqlite3 already caches prepared statements per connection (keyed by SQL text,
+    LRU-evicted, up to cached_statements); this just keeps one connection open
+    so that cache survives between calls.
+    """
+    
+    def __init__(self, db_path: str, maxsize: int = 64):
+        self.maxsize = maxsize
+        self.executions = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=maxsize)
+        self.conn.row_factory = sqlite3.Row
+    
+    def execute(self, sql: str, params: Sequence = (), commit: bool = False) -> List[sqlite3.Row]:
+        """Run one statement and return its rows"""
+        with self._lock:
+            self.executions += 1
+            cursor = self.conn.execute(sql, params)
+            rows = cursor.fetchall()
+            if commit:
+                self.conn.commit()
+            return rows
+    
+    def executemany(self, sql: str, param_rows: Sequence[Sequence], commit: bool = True) -> int:
+        """Run one statement over many parameter rows in a single transaction"""
+        with self._lock:
+            self.executions += 1
+            try:
+                cursor = self.conn.executemany(sql, param_rows)
+            except Exception:
+                self.conn.rollback()  # don't leave half the rows for the next commit
+                raise
+            if commit:
+                self.conn.commit()
+            return cursor.rowcount
+    
+    def stats(self) -> Dict[str, int]:
+        """Statements run through this connection, and its statement cache size"""
+        return {'executions': self.executions, 'statement_cache_size': self.maxsize}
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+SQL_UPDATE_SETTING = """
+    UPDATE settings 
+    SET setting_value = ?, updated_at = ?
+    WHERE setting_key = ?
+"""
+
+
 class SettingsManager:
     """
     Centralized settings management system
@@ -19,17 +74,27 @@ class SettingsManager:
     def __init__(self, db_path: str = 'mt5_intelligence.db'):
         self.db_path = db_path
         self.cache = {}
+        self._stmts = None
         self.load_all_settings()
     
+    def _statements(self) -> PreparedStatementCache:
+        """The shared prepared-statement connection, opened on first use"""
+        if self._stmts is None:
+            self._stmts = PreparedStatementCache(self.db_path)
+        return self._stmts
+    
+    def _exec(self, sql: str, params: Sequence = (), commit: bool = False):
+        """Run one statement through the shared prepared-statement cache"""
+        return self._statements().execute(sql, params, commit=commit)
+    
+    def _execmany(self, sql: str, param_rows: Sequence[Sequence], commit: bool = True) -> int:
+        """Run one statement over many parameter rows in a single transaction"""
+        return self._statements().executemany(sql, param_rows, commit=commit)
+    
     def load_all_settings(self) -> Dict[str, Any]:
         """Load all settings from database into cache"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM settings")
-            rows = cursor.fetchall()
+            rows = self._exec("SELECT * FROM settings")
             
             self.cache = {}
             for row in rows:
@@ -46,7 +111,6 @@ class SettingsManager:
                     'max': self._parse_value(row['max_value'], row['setting_type']) if row['max_value'] else None
                 }
             
-            conn.close()
             return self.cache
             
         except Exception as e:
@@ -82,10 +146,10 @@ class SettingsManager:
             if data['tier'] == tier
         }
     
-    def set(self, key: str, value: Any) -> Tuple[bool, str]:
+    def _validate(self, key: str, value: Any) -> Tuple[bool, Any]:
         """
-        Set setting value with validation
-        Returns (success, message)
+        Type- and range-check a value for a setting
+        Returns (True, validated_value) or (False, error message)
         """
         if key not in self.cache:
             return False, f"Setting '{key}' not found"
@@ -109,21 +173,26 @@ class SettingsManager:
         if max_val is not None and validated_value > max_val:
             return False, f"Value {validated_value} exceeds maximum {max_val}"
         
+        return True, validated_value
+    
+    def _update_row(self, key: str, validated_value: Any) -> Tuple:
+        """Parameters for SQL_UPDATE_SETTING"""
+        return (self._serialize_value(validated_value, self.cache[key]['type']),
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                key)
+    
+    def set(self, key: str, value: Any) -> Tuple[bool, str]:
+        """
+        Set setting value with validation
+        Returns (success, message)
+        """
+        ok, validated_value = self._validate(key, value)
+        if not ok:
+            return False, validated_value
+        
         # Save to database
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE settings 
-                SET setting_value = ?, updated_at = ?
-                WHERE setting_key = ?
-            """, (self._serialize_value(validated_value, setting_type), 
-                  datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                  key))
-            
-            conn.commit()
-            conn.close()
+            self._exec(SQL_UPDATE_SETTING, self._update_row(key, validated_value), commit=True)
             
             # Update cache
             self.cache[key]['value'] = validated_value
@@ -136,12 +205,32 @@ class SettingsManager:
     def set_multiple(self, settings_dict: Dict[str, Any]) -> Dict[str, Tuple[bool, str]]:
         """
         Set multiple settings at once
+        Valid values are written in one executemany transaction
         Returns dictionary of results for each key
         """
         results = {}
+        valid = {}
         for key, value in settings_dict.items():
-            results[key] = self.set(key, value)
-        return results
+            ok, validated_value = self._validate(key, value)
+            if ok:
+                valid[key] = validated_value
+            else:
+                results[key] = (False, validated_value)
+        
+        if valid:
+            try:
+                self._execmany(SQL_UPDATE_SETTING,
+                               [self._update_row(key, v) for key, v in valid.items()])
+            except Exception as e:
+                for key in valid:
+                    results[key] = (False, f"Database error: {str(e)}")
+            else:
+                for key, validated_value in valid.items():
+                    self.cache[key]['value'] = validated_value
+                    results[key] = (True, f"Setting '{key}' updated successfully")
+        
+        # Same key order as the input
+        return {key: results[key] for key in settings_dict}
     
     def reset(self, key: str) -> Tuple[bool, str]:
         """Reset setting to default value"""
@@ -153,18 +242,12 @@ class SettingsManager:
     
     def reset_all(self) -> Dict[str, Tuple[bool, str]]:
         """Reset all settings to defaults"""
-        results = {}
-        for key in self.cache.keys():
-            results[key] = self.reset(key)
-        return results
+        return self.set_multiple({key: data['default'] for key, data in self.cache.items()})
     
     def reset_category(self, category: str) -> Dict[str, Tuple[bool, str]]:
         """Reset all settings in a category to defaults"""
-        results = {}
         category_settings = self.get_by_category(category)
-        for key in category_settings.keys():
-            results[key] = self.reset(key)
-        return results
+        return self.set_multiple({key: data['default'] for key, data in category_settings.items()})
     
     def export_config(self) -> str:
         """Export current configuration as JSON string"""
@@ -207,6 +290,12 @@ class SettingsManager:
         """Get full metadata for a setting"""
         return self.cache.get(key, None)
     
+    def get_statement_stats(self) -> Dict[str, int]:
+        """Get prepared-statement connection counters"""
+        if self._stmts is None:
+            return {'executions': 0, 'statement_cache_size': 0}
+        return self._stmts.stats()
+    
     # ========================================================================
     # PRIVATE HELPER METHODS
     # ========================================================================
@@ -1,78 +1,144 @@
 """
 SIGNAL BRIDGE - V4 ENGINE TO WEBHOOK WRITER
 v4_engine writes to bridge.txt → webhook_writer reads bridge.txt → writes to webhook_signals.txt
+
+Detection and delivery run on separate threads: the reader polls bridge.txt
+and queues new commands, the writer drains the queue into webhook_signals.txt,
+so a slow webhook write never delays noticing the next bridge command.
 """
 
 import json
 import time
 import os
+import queue
+import threading
 from datetime import datetime
 
 BRIDGE_FILE = "bridge.txt"
 WEBHOOK_FILE = "webhook_signals.txt"
 CHECK_INTERVAL = 0.1  # Check every 100ms
+QUEUE_SIZE = 16       # Pending commands; oldest is dropped when full (stale signals are worthless)
 
-print("="*70)
-print("SIGNAL BRIDGE - LISTENING FOR COMMANDS")
-print("="*70)
-print(f"Bridge file: {BRIDGE_FILE}")
-print(f"Webhook file: {WEBHOOK_FILE}")
-print(f"Waiting for v4_engine to write commands...")
-print("="*70)
-
-last_content = None
+signal_queue = queue.Queue(maxsize=QUEUE_SIZE)
+stop_event = threading.Event()
 signals_written = 0
 
-while True:
-    try:
-        # Check if bridge file exists
-        if not os.path.exists(BRIDGE_FILE):
-            time.sleep(CHECK_INTERVAL)
-            continue
-        
-        # Read bridge file
-        with open(BRIDGE_FILE, 'r') as f:
-            content = f.read().strip()
-        
-        # Skip if empty or already processed
-        if not content or content == last_content:
+
+def enqueue_signal(content):
+    """Queue a bridge command, dropping the oldest pending one if the queue is full"""
+    while True:
+        try:
+            signal_queue.put_nowait(content)
+            return
+        except queue.Full:
+            try:
+                dropped = signal_queue.get_nowait()
+                print(f"⚠️  Queue full, dropping stale command: {dropped[:100]}")
+            except queue.Empty:
+                pass
+
+
+def reader_loop():
+    """Poll bridge.txt and queue each new command"""
+    last_content = None
+    last_mtime = None
+
+    while not stop_event.is_set():
+        try:
+            # Check if bridge file exists / changed since last look
+            try:
+                mtime = os.stat(BRIDGE_FILE).st_mtime_ns
+            except FileNotFoundError:
+                time.sleep(CHECK_INTERVAL)
+                continue
+
+            if mtime == last_mtime:
+                time.sleep(CHECK_INTERVAL)
+                continue
+            last_mtime = mtime
+
+            # Read bridge file
+            with open(BRIDGE_FILE, 'r') as f:
+                content = f.read().strip()
+
+            # Skip if empty or already processed
+            if not content or content == last_content:
+                time.sleep(CHECK_INTERVAL)
+                continue
+
+            # New command received!
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Bridge command received: {content[:100]}")
+            enqueue_signal(content)
+            last_content = content
+
+            # Clear bridge file
+            with open(BRIDGE_FILE, 'w') as f:
+                f.write("")
+
             time.sleep(CHECK_INTERVAL)
+
+        except Exception as e:
+            print(f"✗ Reader error: {e}")
+            time.sleep(1)
+
+
+def writer_loop():
+    """Drain queued commands into the webhook file"""
+    global signals_written
+
+    while not stop_event.is_set():
+        try:
+            content = signal_queue.get(timeout=CHECK_INTERVAL)
+        except queue.Empty:
             continue
-        
-        # New command received!
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Bridge command received: {content[:100]}")
-        
+
         # Parse and write to webhook
         try:
             signal = json.loads(content)
-            
-            # Write to webhook file
-            with open(WEBHOOK_FILE, 'w') as f:
-                f.write(json.dumps(signal))
-            
+
+            # Write to webhook file (temp + rename so the EA never reads a partial file)
+            tmp_file = WEBHOOK_FILE + ".new"
+            with open(tmp_file, 'wb') as f:
+                f.write(json.dumps(signal).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, WEBHOOK_FILE)
+
             signals_written += 1
             print(f"✓ Signal #{signals_written} written to webhook")
             print(f"  Action: {signal.get('action')}")
             print(f"  Symbol: {signal.get('symbol')}")
             print(f"  Qty: {signal.get('qty', 'N/A')}")
             print(f"  Comment: {signal.get('comment', '')}")
-            
-            # Clear bridge file
-            with open(BRIDGE_FILE, 'w') as f:
-                f.write("")
-            
-            last_content = content
-            
+
         except json.JSONDecodeError:
             print(f"⚠️  Invalid JSON in bridge file, skipping")
-            with open(BRIDGE_FILE, 'w') as f:
-                f.write("")
-        
-        time.sleep(CHECK_INTERVAL)
-        
+        except Exception as e:
+            print(f"✗ Writer error: {e}")
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("SIGNAL BRIDGE - LISTENING FOR COMMANDS")
+    print("="*70)
+    print(f"Bridge file: {BRIDGE_FILE}")
+    print(f"Webhook file: {WEBHOOK_FILE}")
+    print(f"Waiting for v4_engine to write commands...")
+    print("="*70)
+
+    threads = [
+        threading.Thread(target=reader_loop, name="bridge-reader", daemon=True),
+        threading.Thread(target=writer_loop, name="bridge-writer", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            time.sleep(1)
     except KeyboardInterrupt:
+        stop_event.set()
+        for t in threads:
+            t.join(timeout=2)
         print(f"\n\n✓ Bridge stopped. Total signals written: {signals_written}")
-        break
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        time.sleep(1)
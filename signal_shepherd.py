@@ -12,6 +12,7 @@ from datetime import datetime
 from pathlib import Path
 import hashlib
 import logging
+import logging.handlers
 from typing import Dict, Optional
 
 # ============================================================================
@@ -33,11 +34,21 @@ MAX_SIGNAL_AGE_SEC = 30  # Reject signals older than 30s
 # LOGGING SETUP
 # ============================================================================
 
+# File writes are buffered and flushed every LOG_BUFFER_RECORDS records
+# (or immediately on WARNING+), so a signal costs one write() not ten
+LOG_BUFFER_RECORDS = 50
+LOG_FORMAT = '[%(asctime)s] %(levelname)s - %(message)s'
+
+_file_handler = logging.FileHandler(LOG_FILE)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler(LOG_FILE),
+        logging.handlers.MemoryHandler(
+            LOG_BUFFER_RECORDS, flushLevel=logging.WARNING, target=_file_handler
+        ),
         logging.StreamHandler()
     ]
 )
@@ -66,7 +77,7 @@ class SignalShepherd:
         self.last_signal_id = None
         self.last_signal_time = None
         self.start_time = datetime.now()
-        self.last_health_update = datetime.now()
+        self._next_health_at = time.monotonic() + HEALTH_UPDATE_SEC
         
         logger.info("="*70)
         logger.info("TUNITY SIGNAL SHEPHERD v1.0 - STARTING")
@@ -140,15 +151,20 @@ class SignalShepherd:
             # Convert to JSON string
             json_str = json.dumps(signal, separators=(',', ':'))
             
-            # Write in pure ASCII (no UTF-16, no BOM)
-            with open(WEBHOOK_FILE, 'w', encoding='ascii') as f:
-                f.write(json_str)
+            # Write in pure ASCII (no UTF-16, no BOM) to a sibling temp file,
+            # then atomically swap it in so the EA never sees a truncated file
+            tmp_file = WEBHOOK_FILE + ".new"
+            with open(tmp_file, 'wb') as f:
+                f.write(json_str.encode('ascii'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, WEBHOOK_FILE)
             
-            logger.info(f"[OK] Webhook written: {json_str}")
+            logger.info("[OK] Webhook written: %s", json_str)
             return True
             
         except Exception as e:
-            logger.error(f"[FAIL] Webhook write failed: {e}")
+            logger.error("[FAIL] Webhook write failed: %s", e)
             return False
     
     def process_signal(self, json_content: str) -> bool:
@@ -161,33 +177,28 @@ class SignalShepherd:
             # Parse JSON
             signal = json.loads(json_content)
             
-            logger.info(f"\n{'='*70}")
-            logger.info(f"NEW SIGNAL RECEIVED")
-            logger.info(f"{'='*70}")
-            logger.info(f"Raw: {json_content}")
+            logger.info("NEW SIGNAL RECEIVED raw=%s", json_content)
             
             # Generate ID for deduplication
             signal_id = self.generate_signal_id(signal)
             
             # Check for duplicate
             if signal_id == self.last_signal_id:
-                logger.warning(f"[WARN]  DUPLICATE signal (ID: {signal_id}), skipping")
+                logger.warning("[WARN]  DUPLICATE signal (ID: %s), skipping", signal_id)
                 return False
             
             # Validate signal
             is_valid, error_msg = self.validate_signal(signal)
             
             if not is_valid:
-                logger.error(f"[FAIL] VALIDATION FAILED: {error_msg}")
+                logger.error("[FAIL] VALIDATION FAILED: %s", error_msg)
                 self.signals_failed += 1
                 return False
             
-            logger.info(f"[OK] Validation passed")
-            logger.info(f"  Action: {signal['action']}")
-            logger.info(f"  Symbol: {signal['symbol']}")
-            logger.info(f"  Qty: {signal['qty']}")
-            logger.info(f"  Timestamp: {signal['timestamp']}")
-            logger.info(f"  Signal ID: {signal_id}")
+            logger.info(
+                "[OK] SIGNAL valid id=%s action=%s sym=%s qty=%s ts=%s",
+                signal_id, signal['action'], signal['symbol'], signal['qty'], signal['timestamp']
+            )
             
             # Write to webhook
             if self.write_to_webhook(signal):
@@ -195,20 +206,19 @@ class SignalShepherd:
                 self.last_signal_id = signal_id
                 self.last_signal_time = datetime.now()
                 
-                logger.info(f"[OK] SIGNAL #{self.signals_processed} DELIVERED TO MT5")
-                logger.info(f"{'='*70}\n")
+                logger.info("[OK] SIGNAL #%d DELIVERED TO MT5", self.signals_processed)
                 return True
             else:
                 self.signals_failed += 1
                 return False
                 
         except json.JSONDecodeError as e:
-            logger.error(f"[FAIL] JSON parse error: {e}")
+            logger.error("[FAIL] JSON parse error: %s", e)
             self.signals_failed += 1
             return False
             
         except Exception as e:
-            logger.error(f"[FAIL] Process error: {e}")
+            logger.error("[FAIL] Process error: %s", e)
             import traceback
             traceback.print_exc()
             self.signals_failed += 1
@@ -242,10 +252,11 @@ class SignalShepherd:
         
         try:
             while True:
-                # Health check
-                if (datetime.now() - self.last_health_update).total_seconds() >= HEALTH_UPDATE_SEC:
+                # Health check (monotonic clock - cheap to read every tick)
+                now = time.monotonic()
+                if now >= self._next_health_at:
                     self.update_health()
-                    self.last_health_update = datetime.now()
+                    self._next_health_at = now + HEALTH_UPDATE_SEC
                 
                 # Check for bridge file
                 if not os.path.exists(BRIDGE_FILE):
@@ -3,12 +3,43 @@ SIMPLE WEBHOOK SIGNAL WRITER - NO BULLSHIT
 Just writes the damn signal to the file
 """
 
+import argparse
+import asyncio
 import json
 import os
 import glob
+import io
+import base64
+import mmap
 from datetime import datetime
+from functools import lru_cache
 import time
 import anthropic
+import httpx
+
+try:
+    from PIL import Image, UnidentifiedImageError
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import imagehash
+    HAS_IMAGEHASH = True
+except ImportError:
+    HAS_IMAGEHASH = False
+
+try:
+    from watchfiles import awatch, Change
+    HAS_WATCHFILES = True
+except ImportError:
+    HAS_WATCHFILES = False
+
+try:
+    import h2  # noqa: F401 - lets httpx speak HTTP/2
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
 
 # ============================================================================
 # SIMPLE CONFIG
@@ -18,18 +49,94 @@ API_KEY = "sk-ant-REDACTED
 SYMBOL = "XAUG26.sim"
 SCREENSHOT_FOLDER = r"C:\Users\cwils\OneDrive\Desktop\Adaptive MT5 Meta Agent\V11\screenshots"
 WEBHOOK_FILE = "webhook_signals.txt"
-CHECK_INTERVAL_SEC = 60  # How often to check for new signals
+CHECK_INTERVAL_SEC = 60  # How often to check for new signals (polling fallback)
+HEARTBEAT_SEC = 60       # Status line while waiting for new screenshots (watch mode)
+MAX_IN_FLIGHT = 2        # Claude calls allowed to overlap in live mode
+SCREENSHOT_EXTENSIONS = ('.png', '.jpg')
+
+# Vision payload budget - screenshots are cropped to the chart and shrunk to
+# fit MAX_IMAGE_W x MAX_IMAGE_H before upload (fewer image tokens, faster calls)
+CHART_BBOX = None          # (left, top, right, bottom) of the chart area; None = full screenshot
+MAX_IMAGE_W = 1280
+MAX_IMAGE_H = 720
+JPEG_QUALITY = 80
+
+# Skip Claude when the chart looks the same as the last one sent
+# (perceptual-hash Hamming distance below this; needs imagehash + PIL)
+PHASH_SKIP_DISTANCE = 4
+
+# Batch (replay) mode
+BATCH_SIZE = 100           # Screenshots per Message Batches request
+BATCH_MIN_SIZE = 5         # Fewer than this goes through the real-time API instead
+BATCH_POLL_START_SEC = 60  # First status poll; doubles up to BATCH_POLL_MAX_SEC
+BATCH_POLL_MAX_SEC = 600
+
+# One client for the life of the process so the HTTP keep-alive session
+# (TCP + TLS) is reused across checks. httpx drops idle connections after 5s
+# by default - far shorter than the check interval - so keep them open longer
+# than one interval, and multiplex over HTTP/2 when h2 is installed.
+API_TIMEOUT_SEC = 60
+KEEPALIVE_EXPIRY_SEC = CHECK_INTERVAL_SEC * 2
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=MAX_IN_FLIGHT * 2,
+    max_keepalive_connections=MAX_IN_FLIGHT * 2,
+    keepalive_expiry=KEEPALIVE_EXPIRY_SEC,
+)
+_CLIENT = anthropic.Anthropic(
+    api_key=API_KEY,
+    http_client=anthropic.DefaultHttpxClient(
+        http2=HAS_H2, limits=_HTTP_LIMITS, timeout=API_TIMEOUT_SEC),
+)
+_ASYNC_CLIENT = anthropic.AsyncAnthropic(
+    api_key=API_KEY,
+    http_client=anthropic.DefaultAsyncHttpxClient(
+        http2=HAS_H2, limits=_HTTP_LIMITS, timeout=API_TIMEOUT_SEC),
+)
 
 # ============================================================================
 # SIMPLE FUNCTIONS
 # ============================================================================
 
+# Folder mtime only changes when files are added/removed, so one stat of the
+# folder tells us whether the directory scan needs to run again
+_newest_cache = {'folder_mtime': None, 'path': None, 'mtime': None}
+
+def _scan_newest_screenshot():
+    """(path, mtime_ns) of the newest screenshot - os.scandir reuses the
+    directory listing's stat data on Windows instead of a stat() per file"""
+    newest = None
+    with os.scandir(SCREENSHOT_FOLDER) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(SCREENSHOT_EXTENSIONS):
+                continue
+            mtime = entry.stat().st_mtime_ns
+            if newest is None or mtime > newest[1]:
+                newest = (entry.path, mtime)
+    return newest or (None, None)
+
+def get_newest_screenshot_info():
+    """(path, mtime_ns) of the newest screenshot, or (None, None)"""
+    try:
+        folder_mtime = os.stat(SCREENSHOT_FOLDER).st_mtime_ns
+    except OSError:
+        return None, None
+    
+    if folder_mtime == _newest_cache['folder_mtime'] and _newest_cache['path']:
+        # Same file set - only the newest file can have been rewritten in place
+        try:
+            _newest_cache['mtime'] = os.stat(_newest_cache['path']).st_mtime_ns
+        except OSError:
+            _newest_cache['folder_mtime'] = None
+            return get_newest_screenshot_info()
+    elif folder_mtime != _newest_cache['folder_mtime']:
+        _newest_cache['path'], _newest_cache['mtime'] = _scan_newest_screenshot()
+        _newest_cache['folder_mtime'] = folder_mtime
+    
+    return _newest_cache['path'], _newest_cache['mtime']
+
 def get_newest_screenshot():
     """Get the newest screenshot file"""
-    screenshots = glob.glob(os.path.join(SCREENSHOT_FOLDER, "*.png"))
-    if not screenshots:
-        return None
-    return max(screenshots, key=os.path.getmtime)
+    return get_newest_screenshot_info()[0]
 
 def write_signal(action, symbol, qty=1.0, comment=""):
     """Write signal to webhook file"""
@@ -40,26 +147,51 @@ def write_signal(action, symbol, qty=1.0, comment=""):
         "comment": comment
     }
     
-    with open(WEBHOOK_FILE, 'w') as f:
-        f.write(json.dumps(signal))
+    # Temp + rename so the EA never reads a partially written file
+    tmp_file = WEBHOOK_FILE + ".new"
+    with open(tmp_file, 'wb') as f:
+        f.write(json.dumps(signal).encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, WEBHOOK_FILE)
     
     print(f"✓ SIGNAL WRITTEN: {action} {qty} {symbol}")
     return True
 
-def ask_claude_for_decision(screenshot_path):
-    """Ask Claude what to do"""
-    try:
-        client = anthropic.Anthropic(api_key=API_KEY)
+def preprocess_screenshot(screenshot_path):
+    """Crop to CHART_BBOX and downscale into the vision budget, returning JPEG bytes"""
+    with Image.open(screenshot_path) as img:
+        if CHART_BBOX:
+            img = img.crop(CHART_BBOX)
+        img = img.convert('RGB')
+        img.thumbnail((MAX_IMAGE_W, MAX_IMAGE_H), Image.LANCZOS)
         
-        # Read screenshot
-        with open(screenshot_path, 'rb') as f:
-            import base64
-            img_data = base64.b64encode(f.read()).decode('utf-8')
-        
-        # Simple prompt
-        prompt = """Look at this gold futures chart.
+        buf = io.BytesIO()
+        img.save(buf, format='JPEG', quality=JPEG_QUALITY)
+        return buf.getvalue()
+
+@lru_cache(maxsize=8)
+def _encode_screenshot(screenshot_path, mtime_ns, size):
+    """
+    Base64-encode a screenshot; mtime/size are cache keys so an unchanged file is not re-read
+    Returns (base64_data, media_type)
+    """
+    if HAS_PIL:
+        return base64.b64encode(preprocess_screenshot(screenshot_path)).decode('ascii'), "image/jpeg"
+    
+    # No PIL - send the file as-is, encoding straight from the mapped file
+    # instead of read() into a second full-size buffer
+    media_type = "image/jpeg" if screenshot_path.lower().endswith('.jpg') else "image/png"
+    with open(screenshot_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return base64.b64encode(mm).decode('ascii'), media_type
 
-Should I:
+# Static instructions go in the system prompt, marked for prompt caching so
+# repeat calls reuse the cached prefix; only the screenshot changes per call.
+# (Anthropic only caches prefixes above the model's minimum length - ~1024
+# tokens for Sonnet - so this pays off once the strategy text grows.)
+SYSTEM_PROMPT = """You are a trading assistant looking at gold futures chart screenshots.
+
+For each chart, decide whether to:
 - BUY (go long)
 - SELL (go short)  
 - CLOSE (close all positions)
@@ -67,25 +199,41 @@ Should I:
 
 Respond with ONLY ONE WORD: BUY, SELL, CLOSE, or HOLD"""
 
+DECISION_PROMPT = "Should I BUY, SELL, CLOSE, or HOLD?"
+
+def build_decision_request(screenshot_path):
+    """Build the messages.create() params for one screenshot (shared by live and batch mode)"""
+    # Read screenshot
+    st = os.stat(screenshot_path)
+    img_data, media_type = _encode_screenshot(screenshot_path, st.st_mtime_ns, st.st_size)
+    
+    return {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 100,
+        "system": [
+            {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+        ],
+        "messages": [{
+            "role": "user",
+            "content": [
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": media_type,
+                        "data": img_data
+                    }
+                },
+                {"type": "text", "text": DECISION_PROMPT}
+            ]
+        }]
+    }
+
+def ask_claude_for_decision(screenshot_path):
+    """Ask Claude what to do"""
+    try:
         # Call API
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=100,
-            messages=[{
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": "image/png",
-                            "data": img_data
-                        }
-                    },
-                    {"type": "text", "text": prompt}
-                ]
-            }]
-        )
+        message = _CLIENT.messages.create(**build_decision_request(screenshot_path))
         
         # Parse response
         response = message.content[0].text.strip().upper()
@@ -97,53 +245,253 @@ Respond with ONLY ONE WORD: BUY, SELL, CLOSE, or HOLD"""
         print(f"API error: {e}")
         return "HOLD"
 
+async def ask_claude_for_decision_async(screenshot_path):
+    """Ask Claude what to do without blocking the event loop (live mode)"""
+    try:
+        # Image preprocessing/encoding runs in a worker thread
+        params = await asyncio.to_thread(build_decision_request, screenshot_path)
+        message = await _ASYNC_CLIENT.messages.create(**params)
+        
+        # Parse response
+        response = message.content[0].text.strip().upper()
+        
+        print(f"Claude says: {response}")
+        return response
+        
+    except Exception as e:
+        print(f"API error: {e}")
+        return "HOLD"
+
+def ask_claude_batch(screenshots):
+    """
+    Ask Claude about many screenshots via the Message Batches API
+    Half-price tokens but results can take minutes - only for replay/back-testing runs
+    Returns {screenshot_path: decision}; HOLD for any screenshot that could
+    not be read or decided, like the real-time path on an API error
+    """
+    decisions = {}
+    
+    # custom_id only allows [a-zA-Z0-9_-], so key by position and map back
+    requests = []
+    for i, path in enumerate(screenshots):
+        try:
+            requests.append({"custom_id": f"shot-{i}", "params": build_decision_request(path)})
+        except Exception as e:
+            print(f"  {os.path.basename(path)}: unreadable ({e})")
+            decisions[path] = "HOLD"
+    
+    if requests:
+        try:
+            batch = _CLIENT.messages.batches.create(requests=requests)
+            print(f"📦 Batch {batch.id} submitted ({len(requests)} screenshots)")
+            
+            delay = BATCH_POLL_START_SEC
+            while batch.processing_status != "ended":
+                print(f"  Batch {batch.processing_status}, checking again in {delay}s...")
+                time.sleep(delay)
+                delay = min(delay * 2, BATCH_POLL_MAX_SEC)
+                batch = _CLIENT.messages.batches.retrieve(batch.id)
+            
+            for entry in _CLIENT.messages.batches.results(batch.id):
+                path = screenshots[int(entry.custom_id.split('-', 1)[1])]
+                if entry.result.type == "succeeded":
+                    decisions[path] = entry.result.message.content[0].text.strip().upper()
+                else:
+                    print(f"  {os.path.basename(path)}: {entry.result.type}")
+                    decisions[path] = "HOLD"
+        except Exception as e:
+            print(f"Batch API error: {e}")
+    
+    # Anything without a result (batch call failed, entry missing) holds
+    for path in screenshots:
+        decisions.setdefault(path, "HOLD")
+    return decisions
+
 # ============================================================================
 # MAIN LOOP
 # ============================================================================
 
+def handle_decision(decision, iteration):
+    """Write the signal for a Claude decision"""
+    if decision == "BUY":
+        write_signal("BUY", SYMBOL, 1.0, f"Simple_BUY_{iteration}")
+    elif decision == "SELL":
+        write_signal("SELL", SYMBOL, 1.0, f"Simple_SELL_{iteration}")
+    elif decision == "CLOSE":
+        write_signal("CLOSE", SYMBOL, 0.0, f"Simple_CLOSE_{iteration}")
+    else:
+        print("✓ HOLD - No signal written")
+
+_last_phash = {'hash': None}
+_live_state = {'processed': 0, 'last_written': 0}
+
+def screenshot_phash(screenshot):
+    """
+    Perceptual hash of a screenshot, or None when imagehash/PIL are unavailable
+    or the file can't be read (still being written, truncated, rotated away) -
+    None means the frame is not deduped
+    """
+    if not (HAS_IMAGEHASH and HAS_PIL):
+        return None
+    try:
+        with Image.open(screenshot) as img:
+            return imagehash.phash(img)
+    except (OSError, UnidentifiedImageError) as e:
+        print(f"⚠️  Could not hash {os.path.basename(screenshot)}: {e}")
+        return None
+
+def _mtime_or_none(path):
+    """os.path.getmtime, or None if the file was deleted/rotated in the meantime"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+async def decide_and_write(screenshot, iteration, in_flight):
+    """Ask Claude about one screenshot and write the resulting signal"""
+    async with in_flight:
+        decision = await ask_claude_for_decision_async(screenshot)
+    
+    # Calls overlap, so an older screenshot's answer can arrive after a newer one's
+    if iteration < _live_state['last_written']:
+        print(f"✓ Decision for #{iteration} superseded by #{_live_state['last_written']} - not written")
+        return
+    _live_state['last_written'] = iteration
+    
+    # Write signal
+    handle_decision(decision, iteration)
+
+async def dispatch_screenshot(screenshot, iteration, in_flight, tasks):
+    """Dedupe a new screenshot and, if it changed, start its Claude call in the background"""
+    mtime = _mtime_or_none(screenshot)
+    if mtime is None:
+        print(f"⚠️  Screenshot {os.path.basename(screenshot)} disappeared - skipping")
+        return
+    age = (datetime.now() - datetime.fromtimestamp(mtime)).total_seconds()
+    print(f"📸 Screenshot: {os.path.basename(screenshot)} ({age:.0f}s old)")
+    
+    # Skip near-identical frames - the decision would not change
+    phash = await asyncio.to_thread(screenshot_phash, screenshot)
+    last = _last_phash['hash']
+    if phash is not None and last is not None and (phash - last) < PHASH_SKIP_DISTANCE:
+        print("✓ Chart unchanged since last decision - skipping Claude")
+        return
+    if phash is not None:
+        _last_phash['hash'] = phash
+    
+    task = asyncio.create_task(decide_and_write(screenshot, iteration, in_flight))
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+def _is_new_screenshot(change, path):
+    """watchfiles filter - only react to newly added screenshot files"""
+    return change == Change.added and path.lower().endswith(SCREENSHOT_EXTENSIONS)
+
+async def screenshot_events():
+    """
+    Yield screenshots to process: file-create events when watchfiles is
+    installed, otherwise the newest file every CHECK_INTERVAL_SEC
+    """
+    if HAS_WATCHFILES:
+        async for changes in awatch(SCREENSHOT_FOLDER, watch_filter=_is_new_screenshot):
+            # Several files can land in one batch - only the newest matters
+            # (a file already gone again sorts last; dispatch skips it)
+            yield max((path for _, path in changes),
+                      key=lambda p: _mtime_or_none(p) or 0.0)
+        return
+    
+    # Only yield when the newest screenshot changed (new file or rewritten) -
+    # an unchanged (path, mtime) skips hashing and the Claude call entirely
+    last_seen = (None, None)
+    while True:
+        screenshot, mtime = await asyncio.to_thread(get_newest_screenshot_info)
+        if not screenshot:
+            print("⚠️  No screenshots found")
+        elif (screenshot, mtime) != last_seen:
+            last_seen = (screenshot, mtime)
+            yield screenshot
+        await asyncio.sleep(CHECK_INTERVAL_SEC)
+
+async def heartbeat():
+    """Print a status line during long idle periods between screenshots"""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SEC)
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Watching... {_live_state['processed']} screenshots processed")
+
+async def live_loop():
+    """
+    Live mode: the next screenshot is loaded and deduped while the previous
+    Claude call is still in flight (at most MAX_IN_FLIGHT calls overlap)
+    """
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+    tasks = set()
+    heartbeat_task = asyncio.create_task(heartbeat())
+    
+    try:
+        async for screenshot in screenshot_events():
+            _live_state['processed'] += 1
+            iteration = _live_state['processed']
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Screenshot #{iteration}")
+            await dispatch_screenshot(screenshot, iteration, in_flight, tasks)
+    finally:
+        heartbeat_task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+def batch_replay(batch_size=BATCH_SIZE):
+    """Replay every screenshot in the folder (oldest first) through the Message Batches API"""
+    screenshots = sorted(
+        (p for ext in SCREENSHOT_EXTENSIONS for p in glob.glob(os.path.join(SCREENSHOT_FOLDER, f"*{ext}"))),
+        key=os.path.getmtime
+    )
+    print(f"Replaying {len(screenshots)} screenshots in batches of {batch_size}")
+    
+    iteration = 0
+    for start in range(0, len(screenshots), batch_size):
+        chunk = screenshots[start:start + batch_size]
+        
+        if len(chunk) < BATCH_MIN_SIZE:
+            decisions = {path: ask_claude_for_decision(path) for path in chunk}
+        else:
+            decisions = ask_claude_batch(chunk)
+        
+        for path in chunk:
+            iteration += 1
+            print(f"📸 {os.path.basename(path)}: {decisions[path]}")
+            handle_decision(decisions[path], iteration)
+
+def _positive_int(value):
+    """argparse type: an int of at least 1 (a batch size of 0 or less replays nothing)"""
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {size}")
+    return size
+
 def main():
+    parser = argparse.ArgumentParser(description='Simple screenshot → signal writer')
+    parser.add_argument('--batch', action='store_true',
+                        help='Replay the screenshot folder through the Message Batches API (offline evaluation)')
+    parser.add_argument('--batch-size', type=_positive_int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    
     print("="*70)
     print("SIMPLE SIGNAL WRITER - RUNNING")
     print("="*70)
     print(f"Symbol: {SYMBOL}")
     print(f"Screenshot folder: {SCREENSHOT_FOLDER}")
     print(f"Webhook file: {WEBHOOK_FILE}")
-    print(f"Check interval: {CHECK_INTERVAL_SEC}s")
+    if args.batch:
+        print(f"Mode: batch replay")
+    elif HAS_WATCHFILES:
+        print(f"Mode: file events (watchfiles)")
+    else:
+        print(f"Mode: polling every {CHECK_INTERVAL_SEC}s (pip install watchfiles for event mode)")
     print("="*70)
     
-    iteration = 0
-    
-    while True:
-        iteration += 1
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Check #{iteration}")
-        
-        # Get newest screenshot
-        screenshot = get_newest_screenshot()
-        
-        if not screenshot:
-            print("⚠️  No screenshots found")
-            time.sleep(CHECK_INTERVAL_SEC)
-            continue
-        
-        age = (datetime.now() - datetime.fromtimestamp(os.path.getmtime(screenshot))).total_seconds()
-        print(f"📸 Screenshot: {os.path.basename(screenshot)} ({age:.0f}s old)")
-        
-        # Ask Claude
-        decision = ask_claude_for_decision(screenshot)
-        
-        # Write signal
-        if decision == "BUY":
-            write_signal("BUY", SYMBOL, 1.0, f"Simple_BUY_{iteration}")
-        elif decision == "SELL":
-            write_signal("SELL", SYMBOL, 1.0, f"Simple_SELL_{iteration}")
-        elif decision == "CLOSE":
-            write_signal("CLOSE", SYMBOL, 0.0, f"Simple_CLOSE_{iteration}")
-        else:
-            print("✓ HOLD - No signal written")
-        
-        # Wait
-        print(f"Waiting {CHECK_INTERVAL_SEC}s...")
-        time.sleep(CHECK_INTERVAL_SEC)
+    if args.batch:
+        batch_replay(args.batch_size)
+    else:
+        asyncio.run(live_loop())
 
 
 if __name__ == "__main__":
@@ -61,19 +61,61 @@ def check_and_install_dependencies():
     print("="*70 + "\n")
     return True
 
-if not check_and_install_dependencies():
-    print("\n✗ Dependency installation failed")
-    sys.exit(1)
+# Sentinel written after a successful check. While it is newer than this file
+# (where the package list lives) the check - which imports everything and may
+# pip install - is skipped, so restarts and extra workers boot fast.
+# The sentinel records the interpreter, so a different venv re-checks.
+# Delete it to force a re-check.
+DEPS_SENTINEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.deps_ok')
+
+def deps_already_checked():
+    """True if the sentinel is newer than this script and was written by this interpreter"""
+    try:
+        if os.path.getmtime(DEPS_SENTINEL) < os.path.getmtime(os.path.abspath(__file__)):
+            return False
+        with open(DEPS_SENTINEL) as f:
+            return f.read().strip() == sys.executable
+    except OSError:
+        return False
+
+if not deps_already_checked():
+    if not check_and_install_dependencies():
+        print("\n✗ Dependency installation failed")
+        sys.exit(1)
+    try:
+        with open(DEPS_SENTINEL, 'w') as f:
+            f.write(f"{sys.executable}\n")
+    except OSError as e:
+        print(f"⚠️  Could not write {DEPS_SENTINEL}: {e}")
 
 # ============================================================================
 # IMPORTS
 # ============================================================================
 
-from flask import Flask, render_template, jsonify, request, redirect
+from flask import Flask, Response, render_template, jsonify, request, redirect, g
 from flask_cors import CORS
 import sqlite3
 from datetime import datetime
+from pathlib import Path
 import threading
+import time
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, asdict
+from functools import lru_cache, wraps
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
 
 try:
     from mt5_multi_collector import MT5MultiSymbolCollector
@@ -93,6 +135,38 @@ from config import SYMBOL_DATABASES, DEFAULT_SYMBOL, COLLECTOR_TIMEFRAMES, COLLE
 # Legacy single-symbol variables (backward compatibility)
 DB_PATH = SYMBOL_DATABASES[DEFAULT_SYMBOL]['db_path']
 
+# Database existence, resolved once at startup instead of an os.path.exists()
+# per request. A database that exists is trusted until a connect fails; a
+# missing one is re-checked at most every DB_RECHECK_SEC so newly created
+# databases still show up without a restart.
+DB_RECHECK_SEC = 5.0
+RESOLVED_DBS = {
+    sym_id: {
+        'path': config['db_path'],
+        'exists': os.path.exists(config['db_path']),
+        'checked': time.monotonic()
+    }
+    for sym_id, config in SYMBOL_DATABASES.items()
+}
+
+
+def _resolved_db_exists(entry):
+    """Cached existence for a RESOLVED_DBS entry, re-checking stale misses"""
+    if not entry['exists']:
+        now = time.monotonic()
+        if now - entry['checked'] >= DB_RECHECK_SEC:
+            entry['exists'] = os.path.exists(entry['path'])
+            entry['checked'] = now
+    return entry['exists']
+
+
+def mark_db_missing(symbol_id):
+    """Flag a database as gone (e.g. after a failed connect) so it gets re-checked"""
+    entry = RESOLVED_DBS.get(symbol_id)
+    if entry:
+        entry['exists'] = False
+        entry['checked'] = time.monotonic()
+
 # ============================================================================
 # FLASK APP
 # ============================================================================
@@ -101,19 +175,156 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'mt5-meta-agent-v11-3-secret-key'
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Compress JSON responses on the fly (chart/indicator payloads repeat column
+# names every row and shrink 5-10x). flask-compress adds brotli; without it
+# a plain gzip after_request hook does the same job.
+COMPRESS_MIN_BYTES = 512
+COMPRESS_LEVEL = 4  # Fast levels get most of the ratio on repetitive JSON
+
+if HAS_COMPRESS:
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_LEVEL'] = COMPRESS_LEVEL
+    app.config['COMPRESS_BR_LEVEL'] = COMPRESS_LEVEL
+    app.config['COMPRESS_MIN_SIZE'] = COMPRESS_MIN_BYTES
+    Compress(app)
+else:
+    @app.after_request
+    def gzip_json_response(response):
+        """gzip JSON bodies for clients that accept it (flask-compress fallback)"""
+        if (response.mimetype != 'application/json'
+                or response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not request.accept_encodings['gzip']):
+            return response
+        
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        
+        response.set_data(gzip.compress(data, COMPRESS_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+
 # ============================================================================
 # DATABASE HELPERS (Legacy)
 # ============================================================================
 
 def get_db_connection():
-    """Get SQLite database connection (legacy - uses default DB_PATH)"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Get SQLite database connection (legacy - uses default DB_PATH).
+    Comes from the same per-thread read-only pool as the symbol connections
+    (see _pooled_connect), so conn.close() hands it back instead of closing.
+    """
+    return _pooled_connect(DB_PATH)
 
 def db_exists():
     """Check if database file exists (legacy - uses default DB_PATH)"""
-    return os.path.exists(DB_PATH)
+    return _resolved_db_exists(RESOLVED_DBS[DEFAULT_SYMBOL])
+
+def json_response(payload, status=200):
+    """
+    Serialize a JSON response, using orjson when installed.
+    orjson encodes the row lists returned by the data endpoints several
+    times faster than jsonify and writes bytes directly.
+    """
+    if HAS_ORJSON:
+        return Response(dumps_json(payload), status=status, mimetype='application/json')
+    response = jsonify(payload)
+    response.status_code = status
+    return response
+
+def _sqlite_has_json():
+    """JSON1 functions are built into SQLite 3.38+ and most older Python builds"""
+    try:
+        sqlite3.connect(':memory:').execute("SELECT json_group_array(json_object('a', 1))")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+HAS_SQLITE_JSON = _sqlite_has_json()
+
+def sql_json_body(count, data_json, **extra):
+    """
+    Wrap a JSON array produced by SQLite (json_group_array) in the standard
+    {success, count, data, ...} envelope without decoding it in Python.
+    """
+    body = b'{"success":true,"count":%d,"data":' % count + data_json.encode('utf-8')
+    if extra:
+        # Splice the extra keys in, reusing their object's closing brace
+        return body + b',' + dumps_json(extra)[1:]
+    return body + b'}'
+
+def dumps_json(payload):
+    """JSON-encode a payload to bytes (orjson when installed)"""
+    if HAS_ORJSON:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=str).encode('utf-8')
+
+# (endpoint, format) -> (db write signature, etag, encoded body)
+_snapshots = {}
+
+def snapshot_response(name, build_payload, db_path=None):
+    """
+    Serve a rarely-changing endpoint from cached, already-encoded JSON.
+    build_payload() only runs again once the database's write signature
+    (main file + WAL mtime) moves; it may return a payload or ready-encoded
+    bytes. The body's hash goes out as an ETag, and a matching If-None-Match
+    gets a bodiless 304. A gzip copy is kept alongside, so gzip-accepting
+    clients get pre-compressed bytes instead of per-request compression.
+    """
+    key = (name, request.args.get('format'))
+    signature = _db_mtime(db_path or DB_PATH)
+    
+    entry = _snapshots.get(key)
+    if entry is None or entry[0] != signature:
+        body = build_payload()
+        if not isinstance(body, bytes):
+            body = dumps_json(body)
+        gz_body = gzip.compress(body, COMPRESS_LEVEL) if len(body) >= COMPRESS_MIN_BYTES else None
+        entry = (signature, hashlib.sha1(body).hexdigest()[:20], body, gz_body)
+        _snapshots[key] = entry
+    
+    _, etag, body, gz_body = entry
+    use_gzip = gz_body is not None and request.accept_encodings['gzip']
+    if use_gzip:
+        etag += '-gz'  # Distinct representation, distinct tag
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif use_gzip:
+        response = Response(gz_body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    return response
+
+def ttl_cache(seconds):
+    """
+    Memoize a function's result per argument tuple for `seconds`.
+    For hot read-only lookups polled by the dashboard (record counts etc.).
+    The wrapped function gets cache_clear() to drop stale entries after a write.
+    """
+    def decorator(func):
+        cache = {}
+        
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and now - hit[0] < seconds:
+                return hit[1]
+            result = func(*args)
+            cache[args] = (now, result)
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
 
 # ============================================================================
 # BC-003 | DATABASE_PATH_RESOLVER
@@ -127,13 +338,11 @@ def get_symbol_db_path(symbol_id):
     Resolve database path for a given symbol ID.
     Returns (db_path, exists) tuple.
     """
-    config = SYMBOL_DATABASES.get(symbol_id)
-    if not config:
+    entry = RESOLVED_DBS.get(symbol_id)
+    if not entry:
         return None, False
     
-    db_path = config['db_path']
-    exists = os.path.exists(db_path)
-    return db_path, exists
+    return entry['path'], _resolved_db_exists(entry)
 
 
 def get_symbol_config(symbol_id):
@@ -151,9 +360,65 @@ def get_symbol_config(symbol_id):
 # STOIC Alignment: S↑ (consistent connection handling)
 # ============================================================================
 
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection that stays open for reuse by the same thread.
+    close() just ends any open transaction and hands the handle back to the
+    pool, so existing `conn.close()` calls in the routes keep working.
+    """
+    
+    def close(self):
+        self.rollback()
+    
+    def begin_read(self):
+        """
+        Open one deferred read transaction so an endpoint's statements share a
+        single snapshot (one shared-lock acquire, consistent counts) instead of
+        each autocommitting on its own. close() ends it.
+        """
+        self.execute("BEGIN DEFERRED")
+
+
+# One connection per (thread, database) - opened on first use, then reused
+_db_pool = threading.local()
+
+# Per-connection prepared-statement cache. The endpoint SQL is module-level
+# constants (one string per query shape), so every statement stays prepared
+# on each pooled connection after its first use.
+STATEMENT_CACHE_SIZE = 256
+
+
+def _pooled_connect(db_path):
+    """
+    Get this thread's pooled connection to db_path, opening it if needed.
+    The API only reads, so connections are opened read-only: no writer lock
+    coordination, and with WAL (set at startup) readers never block the collectors.
+    """
+    conns = getattr(_db_pool, 'conns', None)
+    if conns is None:
+        conns = _db_pool.conns = {}
+    
+    conn = conns.get(db_path)
+    if conn is None:
+        uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, factory=PooledConnection,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conns[db_path] = conn
+    elif conn.in_transaction:
+        # A request that errored out before close() - don't let its snapshot
+        # linger (it would also pin the WAL and block checkpoints)
+        conn.rollback()
+    return conn
+
+
 def get_symbol_db_connection(symbol_id):
     """
-    Create SQLite connection to symbol-specific database.
+    Get pooled SQLite connection to symbol-specific database.
     Returns (connection, error_message) tuple.
     Connection is None if error occurred.
     """
@@ -166,13 +431,235 @@ def get_symbol_db_connection(symbol_id):
         return None, f"Database not found: {db_path}"
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn, None
+        return _pooled_connect(db_path), None
     except Exception as e:
+        if not os.path.exists(db_path):
+            mark_db_missing(symbol_id)
         return None, f"Connection error: {str(e)}"
 
 
+# ============================================================================
+# QUERY PARAMETERS + PRECOMPILED SQL
+# Table names can't be bound as SQL parameters, so the per-timeframe
+# statements are built once here from a fixed whitelist instead of
+# f-string'd from request input on every call.
+# ============================================================================
+
+ALLOWED_TIMEFRAMES = frozenset({'1m', '15m'})
+DEFAULT_TIMEFRAME = '15m'
+MAX_QUERY_LIMIT = 5000
+
+# Prices are rounded to the symbol's precision in SQL so JSON carries
+# 2355.17 rather than 2355.1699999999996 (smaller payload, cheaper encoding)
+PRICE_COLUMNS_SQL = """
+    ROUND(open, :digits) AS open, ROUND(high, :digits) AS high,
+    ROUND(low, :digits) AS low, ROUND(close, :digits) AS close
+"""
+DEFAULT_PRICE_DIGITS = 5
+
+CHART_SQL = {
+    tf: f"""
+        SELECT * FROM (
+            SELECT timestamp, {PRICE_COLUMNS_SQL}, volume
+            FROM core_{tf}
+            ORDER BY timestamp DESC
+            LIMIT :limit
+        ) ORDER BY timestamp ASC
+    """
+    for tf in ALLOWED_TIMEFRAMES
+}
+
+CORE_SQL = {
+    tf: f"""
+        SELECT timestamp, {PRICE_COLUMNS_SQL}, volume
+        FROM core_{tf}
+        ORDER BY timestamp DESC
+        LIMIT :limit
+    """
+    for tf in ALLOWED_TIMEFRAMES
+}
+
+TABLE_EXISTS_SQL = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
+
+BASIC_SQL = {
+    tf: f"""
+        SELECT timestamp, atr_14, atr_50_avg, atr_ratio,
+               ema_short, ema_medium, ema_distance, supertrend
+        FROM basic_{tf}
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """
+    for tf in ALLOWED_TIMEFRAMES
+}
+
+
+def get_timeframe_arg():
+    """?timeframe= validated against ALLOWED_TIMEFRAMES (unknown values fall back to 15m)"""
+    timeframe = request.args.get('timeframe', DEFAULT_TIMEFRAME)
+    return timeframe if timeframe in ALLOWED_TIMEFRAMES else DEFAULT_TIMEFRAME
+
+
+def get_price_digits(symbol_id):
+    """Decimal places for a symbol's prices (config 'digits')"""
+    config = SYMBOL_DATABASES.get(symbol_id or DEFAULT_SYMBOL) or {}
+    return config.get('digits', DEFAULT_PRICE_DIGITS)
+
+
+INT_QUERY_ARGS = ('limit', 'group_id')
+
+
+@app.before_request
+def parse_query_args():
+    """
+    Parse the integer query parameters once per API request and stash them on
+    flask.g (None when absent). Malformed values get a 400 here instead of a
+    ValueError surfacing as a 500 inside the handler.
+    """
+    if not request.path.startswith('/api/'):
+        return None
+    
+    for name in INT_QUERY_ARGS:
+        raw = request.args.get(name)
+        if raw in (None, ''):
+            setattr(g, name, None)
+            continue
+        try:
+            setattr(g, name, int(raw))
+        except ValueError:
+            return json_response({
+                'success': False,
+                'error': f'Invalid {name}: {raw!r} (expected an integer)'
+            }, 400)
+    return None
+
+
+def get_limit_arg(default):
+    """?limit= clamped to 1..MAX_QUERY_LIMIT (SQLite treats a negative LIMIT as no limit)"""
+    limit = g.get('limit')
+    if limit is None:
+        limit = default
+    return max(1, min(limit, MAX_QUERY_LIMIT))
+
+
+def tuple_cursor(conn):
+    """
+    Cursor that returns plain tuples even on Row-factory connections.
+    Rows only get turned into dicts/lists for JSON, so building sqlite3.Row
+    objects first (and dict(row) with its per-column name lookups) is wasted work.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+FETCH_CHUNK_ROWS = 500
+
+
+def iter_rows(cursor, size=FETCH_CHUNK_ROWS):
+    """Yield a cursor's rows in fetchmany() chunks instead of one fetchall() list"""
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield from batch
+
+
+def rows_to_dicts(cursor, rows=None):
+    """
+    Zip tuple rows with the column names read once from cursor.description.
+    With no rows given, streams the cursor itself so only the dicts are ever
+    held in full (not a fetchall() tuple list alongside them).
+    """
+    cols = [col[0] for col in cursor.description]
+    if rows is None:
+        rows = iter_rows(cursor)
+    return [dict(zip(cols, row)) for row in rows]
+
+
+def columnar_requested():
+    """True when the caller asked for ?format=columnar"""
+    return request.args.get('format') == 'columnar'
+
+
+def dicts_to_columnar(columns, data):
+    """Columnar shape for rows that were post-processed as dicts"""
+    return {
+        'columns': columns,
+        'rows': [[item[col] for col in columns] for item in data]
+    }
+
+
+def shape_rows(cursor):
+    """
+    Build the 'data' field for a row-returning endpoint from an executed cursor.
+    Default: list of objects (what the dashboard consumes).
+    ?format=columnar: {"columns": [...], "rows": [[...], ...]} - column names
+    sent once instead of per row, a fraction of the bytes and encode time.
+    Returns (data, count).
+    """
+    if columnar_requested():
+        rows = cursor.fetchall()
+        return {
+            'columns': [col[0] for col in cursor.description],
+            'rows': rows
+        }, len(rows)
+    data = rows_to_dicts(cursor)
+    return data, len(data)
+
+
+# ============================================================================
+# API QUERY INDEXES
+# The data endpoints all read "latest N rows" - WHERE timeframe = ? ORDER BY
+# timestamp DESC LIMIT ?. With these indexes SQLite walks the index range
+# backwards for N rows instead of scanning and sorting the whole table.
+# ============================================================================
+
+API_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_adv_tf_ts ON advanced_indicators(timeframe, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fib_tf_ts ON fibonacci_data(timeframe, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_ath_tf_ts ON ath_tracking(timeframe, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_core1m_ts ON core_1m(timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_core15m_ts ON core_15m(timestamp DESC)",
+    # Apex V2.0 catalog endpoints: filter + ORDER BY served in index order
+    "CREATE INDEX IF NOT EXISTS idx_ic_group_active ON indicator_configs(group_id, is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_ic_group_order ON indicator_configs(group_id, display_order, is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_ind_group_id ON indicators(default_group_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_igroups_display ON indicator_groups(display_order)",
+    "CREATE INDEX IF NOT EXISTS idx_aar_sym_tf_ts ON ai_analysis_results(symbol, timeframe, timestamp DESC)",
+]
+
+# Rows sampled per index by ANALYZE - enough for the planner to choose
+# between indexes without reading whole tables at startup
+ANALYZE_ROW_LIMIT = 1000
+
+
+def ensure_api_indexes(db_path):
+    """Create the API query indexes on an existing database (tables that don't exist are skipped)"""
+    created = 0
+    conn = sqlite3.connect(db_path)
+    try:
+        # WAL is persistent and needs a writable connection - the API's
+        # pooled connections are read-only, so switch it on here
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        for sql in API_INDEXES:
+            try:
+                conn.execute(sql)
+                created += 1
+            except sqlite3.OperationalError:
+                # Table doesn't exist in this database
+                pass
+        conn.commit()
+        
+        # Refresh planner statistics so the new indexes actually get picked
+        conn.execute(f"PRAGMA analysis_limit={ANALYZE_ROW_LIMIT}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
 # ============================================================================
 # BC-004 | RECORD_COUNT_AGGREGATOR  
 # SQL queries to count records in core_1m and core_15m tables per symbol.
@@ -180,10 +667,34 @@ def get_symbol_db_connection(symbol_id):
 # STOIC Alignment: T↑ (measurable metrics per symbol)
 # ============================================================================
 
+def _table_row_count(cursor, table_name):
+    """
+    Exact row count (COUNT(*)). MAX(rowid) is not usable as a shortcut here:
+    the core tables are AUTOINCREMENT and refills (goldfill/fillall/backfill)
+    DELETE + INSERT OR REPLACE, so rowids keep climbing past the row count.
+    Returns 0 if the table is missing or empty.
+    """
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+        result = cursor.fetchone()
+        return (result[0] or 0) if result else 0
+    except sqlite3.OperationalError:
+        # Table doesn't exist
+        return 0
+
+
+# COUNT(*) walks a whole index, so counts are cached well past the 2 s status
+# refresh; 1m bars arrive once a minute, so 15 s stale is invisible.
+RECORD_COUNTS_TTL_SEC = 15.0
+
+@ttl_cache(RECORD_COUNTS_TTL_SEC)
 def get_symbol_record_counts(symbol_id):
     """
     Get record counts for 1m and 15m timeframes from symbol database.
     Returns dict with records_1m and records_15m (0 if table missing).
+    Counts are exact COUNT(*)s, cached for RECORD_COUNTS_TTL_SEC so the
+    status refresher and a dashboard polling /api/status don't re-count every
+    symbol each time; the returned dict is shared, treat it as read-only.
     """
     conn, error = get_symbol_db_connection(symbol_id)
     
@@ -194,25 +705,8 @@ def get_symbol_record_counts(symbol_id):
     
     try:
         cursor = conn.cursor()
-        
-        # Count 1m records - handle missing table gracefully
-        try:
-            cursor.execute("SELECT COUNT(*) as count FROM core_1m")
-            result = cursor.fetchone()
-            counts['records_1m'] = result['count'] if result else 0
-        except sqlite3.OperationalError:
-            # Table doesn't exist
-            counts['records_1m'] = 0
-        
-        # Count 15m records - handle missing table gracefully
-        try:
-            cursor.execute("SELECT COUNT(*) as count FROM core_15m")
-            result = cursor.fetchone()
-            counts['records_15m'] = result['count'] if result else 0
-        except sqlite3.OperationalError:
-            # Table doesn't exist
-            counts['records_15m'] = 0
-        
+        counts['records_1m'] = _table_row_count(cursor, 'core_1m')
+        counts['records_15m'] = _table_row_count(cursor, 'core_15m')
         conn.close()
         
     except Exception as e:
@@ -225,6 +719,179 @@ def get_symbol_record_counts(symbol_id):
     return counts
 
 
+# All symbol databases ATTACHed (read-only) to one in-memory connection per
+# thread, so every symbol's counts come back from a single query instead of
+# one connection + two queries per symbol
+SYMBOL_DB_ALIASES = {sym_id: f"sym_{i}" for i, sym_id in enumerate(SYMBOL_DATABASES)}
+COUNTED_TABLES = ('core_1m', 'core_15m')
+_attach_pool = threading.local()
+
+
+def _attached_connection():
+    """This thread's :memory: connection with every existing symbol DB attached"""
+    state = getattr(_attach_pool, 'state', None)
+    if state is None:
+        conn = sqlite3.connect('file::memory:', uri=True)
+        state = _attach_pool.state = {'conn': conn, 'attached': {}, 'tables': None, 'sql': None}
+    
+    for sym_id, config in SYMBOL_DATABASES.items():
+        if sym_id in state['attached'] or not get_symbol_db_path(sym_id)[1]:
+            continue
+        alias = SYMBOL_DB_ALIASES[sym_id]
+        uri = Path(config['db_path']).resolve().as_uri() + '?mode=ro'
+        state['conn'].execute(f"ATTACH DATABASE ? AS {alias}", (uri,))
+        state['attached'][sym_id] = alias
+        state['tables'] = state['sql'] = None
+    
+    return state
+
+
+@ttl_cache(RECORD_COUNTS_TTL_SEC)
+def get_all_symbol_record_counts():
+    """
+    Record counts for every symbol database in one round-trip.
+    Returns {symbol_id: {'records_1m': n, 'records_15m': n}} for each existing database.
+    Cached for RECORD_COUNTS_TTL_SEC (shared by /api/symbols and /api/status).
+    """
+    state = _attached_connection()
+    attached = state['attached']
+    if not attached:
+        return {}
+    
+    conn = state['conn']
+    names = ', '.join(f"'{t}'" for t in COUNTED_TABLES)
+    
+    # Which counted tables exist in each database (one query across all of them)
+    tables = frozenset(conn.execute(" UNION ALL ".join(
+        f"SELECT '{sym_id}', name FROM {alias}.sqlite_master WHERE type='table' AND name IN ({names})"
+        for sym_id, alias in attached.items()
+    )).fetchall())
+    
+    # Rebuild the count statement only when the attached schema changes
+    if tables != state['tables']:
+        selects = []
+        for sym_id, alias in attached.items():
+            cols = [
+                f"(SELECT COUNT(*) FROM {alias}.{t})" if (sym_id, t) in tables else "0"
+                for t in COUNTED_TABLES
+            ]
+            selects.append(f"SELECT '{sym_id}', {', '.join(cols)}")
+        state['tables'] = tables
+        state['sql'] = " UNION ALL ".join(selects)
+    
+    return {
+        sym_id: {'records_1m': c1m or 0, 'records_15m': c15m or 0}
+        for sym_id, c1m, c15m in conn.execute(state['sql'])
+    }
+
+
+def get_record_counts_by_symbol():
+    """
+    Record counts for every existing symbol database: the single ATTACHed
+    query, falling back to one connection per symbol if that fails.
+    """
+    try:
+        return get_all_symbol_record_counts()
+    except sqlite3.Error as e:
+        print(f"[API] Batched record counts failed, counting per symbol: {e}")
+        return {
+            sym_id: get_symbol_record_counts(sym_id)
+            for sym_id in SYMBOL_DATABASES
+            if get_symbol_db_path(sym_id)[1]
+        }
+
+
+# ============================================================================
+# SYMBOL STATUS SNAPSHOT
+# /api/status is polled by the dashboard; rather than counting and stat'ing
+# per hit, a background thread refreshes one snapshot per tick and the
+# endpoint just reads it. The dict is rebuilt and swapped in whole, so
+# readers never see a half-updated snapshot (no lock needed).
+# ============================================================================
+
+STATUS_REFRESH_SEC = 2.0
+
+
+@dataclass
+class SymbolStatus:
+    name: str
+    available: bool
+    records_1m: int
+    records_15m: int
+
+
+SYMBOL_STATUS = {}        # symbol_id -> SymbolStatus
+STATUS_TIMESTAMP = None   # When SYMBOL_STATUS was taken ('%Y-%m-%d %H:%M:%S')
+COLLECTOR_STATUS = None   # (running, type, stats) as of the last tick
+
+
+def refresh_symbol_status():
+    """Rebuild SYMBOL_STATUS from one batched count query"""
+    global SYMBOL_STATUS, STATUS_TIMESTAMP
+    
+    all_counts = get_record_counts_by_symbol()
+    snapshot = {}
+    for sym_id, config in SYMBOL_DATABASES.items():
+        counts = all_counts.get(sym_id, {})
+        snapshot[sym_id] = SymbolStatus(
+            name=config['name'],
+            available=get_symbol_db_path(sym_id)[1],
+            records_1m=int(counts.get('records_1m', 0)),
+            records_15m=int(counts.get('records_15m', 0))
+        )
+    
+    SYMBOL_STATUS = snapshot
+    STATUS_TIMESTAMP = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def refresh_collector_status():
+    """
+    Snapshot collector state into COLLECTOR_STATUS. Collectors flip .running
+    themselves (e.g. on MT5 errors), so it is re-read every tick rather than
+    tracked at start/stop - but once per tick, not once per status request.
+    """
+    global COLLECTOR_STATUS
+    
+    if multi_collector:
+        running = multi_collector.running
+        COLLECTOR_STATUS = (running, 'multi', multi_collector.get_stats() if running else None)
+    elif collectors:
+        COLLECTOR_STATUS = (any(c.running for c in collectors.values()), 'legacy_multi', None)
+    elif collector:
+        COLLECTOR_STATUS = (collector.running, 'legacy_single', None)
+    else:
+        COLLECTOR_STATUS = (False, 'none', None)
+
+
+def status_refresh_loop():
+    """Background tick keeping SYMBOL_STATUS / COLLECTOR_STATUS current"""
+    while True:
+        try:
+            refresh_collector_status()
+            refresh_symbol_status()
+        except Exception as e:
+            print(f"[STATUS] Refresh failed: {e}")
+        time.sleep(STATUS_REFRESH_SEC)
+
+
+# PID the refresher thread was started in. Threads don't survive fork, so a
+# gunicorn --preload worker sees the master's PID here and starts its own.
+_REFRESHER_PID = None
+_REFRESHER_LOCK = threading.Lock()
+
+
+def start_status_refresher():
+    """Start the status refresher thread in this process (once per process)"""
+    global _REFRESHER_PID
+    with _REFRESHER_LOCK:
+        if _REFRESHER_PID == os.getpid():
+            return None
+        thread = threading.Thread(target=status_refresh_loop, daemon=True, name='status_refresher')
+        thread.start()
+        _REFRESHER_PID = os.getpid()
+        return thread
+
+
 # ============================================================================
 # GLOBAL COLLECTORS
 # ============================================================================
@@ -255,7 +922,7 @@ def tunity():
 @app.route('/api/health')
 def api_health():
     """Quick health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'version': 'V11.3 TUNITY',
@@ -271,25 +938,59 @@ def api_health():
 # STOIC Alignment: S↑ (foundation) + O↑ (unblocks everything)
 # ============================================================================
 
+SYMBOLS_CACHE_TTL = 2.0  # seconds
+_symbols_cache = {'ts': 0.0, 'mtimes': None, 'payload': None}
+_symbols_cache_lock = threading.Lock()
+
+
+def _db_mtime(db_path):
+    """Last-write signature of a database (main file + WAL), 0 if missing"""
+    mtime = 0.0
+    for path in (db_path, db_path + '-wal'):
+        try:
+            mtime = max(mtime, os.path.getmtime(path))
+        except OSError:
+            pass
+    return mtime
+
+
 @app.route('/api/symbols')
 def api_symbols():
     """
     Get available symbol databases with record counts.
     
+    Served from a short-lived cache while no database file has changed,
+    so dashboards polling this route don't fan out to every symbol DB.
+    When one has changed, the record-count TTL caches are dropped too, so
+    the rebuilt payload carries fresh counts rather than ones up to
+    RECORD_COUNTS_TTL_SEC old.
+    
     Returns:
         - symbols: List of symbol objects with id, name, symbol, db_path, 
                    available, records_1m, records_15m
         - active_symbol: First available symbol ID (or default)
         - count: Total number of symbols
     """
+    mtimes = {sym_id: _db_mtime(config['db_path']) for sym_id, config in SYMBOL_DATABASES.items()}
+    
+    with _symbols_cache_lock:
+        db_changed = _symbols_cache['mtimes'] != mtimes
+        if not db_changed and time.monotonic() - _symbols_cache['ts'] < SYMBOLS_CACHE_TTL:
+            return json_response(_symbols_cache['payload'])
+    
+    if db_changed:
+        get_all_symbol_record_counts.cache_clear()
+        get_symbol_record_counts.cache_clear()
+    
     symbols = []
     
+    # Get record counts for all symbols in one query (BC-004)
+    all_counts = get_record_counts_by_symbol()
+    
     for sym_id, config in SYMBOL_DATABASES.items():
         db_path = config['db_path']
-        available = os.path.exists(db_path)
-        
-        # Get record counts using BC-004 aggregator
-        counts = get_symbol_record_counts(sym_id) if available else {'records_1m': 0, 'records_15m': 0}
+        available = get_symbol_db_path(sym_id)[1]
+        counts = all_counts.get(sym_id, {'records_1m': 0, 'records_15m': 0})
         
         symbols.append({
             'id': config['id'],
@@ -308,12 +1009,17 @@ def api_symbols():
             active_symbol = sym['id']
             break
     
-    return jsonify({
+    payload = {
         'success': True,
         'symbols': symbols,
         'active_symbol': active_symbol,
         'count': len(symbols)
-    })
+    }
+    
+    with _symbols_cache_lock:
+        _symbols_cache.update(ts=time.monotonic(), mtimes=mtimes, payload=payload)
+    
+    return json_response(payload)
 
 
 # ============================================================================
@@ -332,82 +1038,71 @@ def api_chart_data():
         - symbol: Symbol ID (default: XAUG26)
         - timeframe: '1m' or '15m' (default: 15m)
         - limit: Number of records (default: 200)
+        - format: 'columnar' for {columns, rows} instead of a list of objects
     
     Returns:
         - success: Boolean
         - symbol: Symbol ticker
         - timeframe: Requested timeframe
         - count: Number of records returned
-        - data: List of OHLCV objects
+        - data: List of OHLCV objects (or {columns, rows} when format=columnar)
     """
     symbol_id = request.args.get('symbol', DEFAULT_SYMBOL)
-    timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 200))
-    
-    # Validate timeframe
-    if timeframe not in ['1m', '15m']:
-        timeframe = '15m'
+    timeframe = get_timeframe_arg()
+    limit = get_limit_arg(200)
     
     # Get symbol config
     config = get_symbol_config(symbol_id)
     if not config:
-        return jsonify({
+        return json_response({
             'success': False, 
             'error': f'Unknown symbol: {symbol_id}'
-        }), 404
+        }, 404)
     
     # Get database connection using BC-006 factory
     conn, error = get_symbol_db_connection(symbol_id)
     if conn is None:
-        return jsonify({
+        return json_response({
             'success': False, 
             'error': error
-        }), 404
+        }, 404)
     
     try:
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         table_name = f'core_{timeframe}'
         
-        # Query chart data
-        cursor.execute(f"""
-            SELECT timestamp, open, high, low, close, volume
-            FROM {table_name}
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
+        # Query chart data - latest N bars, returned in chronological order for charting
+        cursor.execute(CHART_SQL[timeframe], {'digits': get_price_digits(symbol_id), 'limit': limit})
         
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        # Reverse to get chronological order for charting
-        data = [dict(row) for row in reversed(rows)]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'symbol': config['symbol'],
             'symbol_id': symbol_id,
             'symbol_name': config['name'],
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data
         })
         
     except sqlite3.OperationalError as e:
         conn.close()
-        return jsonify({
+        return json_response({
             'success': False,
             'error': f'Table {table_name} not found. Run database initialization.'
-        }), 404
+        }, 404)
         
     except Exception as e:
         try:
             conn.close()
         except:
             pass
-        return jsonify({
+        return json_response({
             'success': False, 
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -417,6 +1112,20 @@ def api_chart_data():
 # STOIC Alignment: T↑ (profile-symbol relationship tracked)
 # ============================================================================
 
+PROFILES_BY_SYMBOL_SQL = """
+    SELECT * FROM profiles 
+    WHERE symbol = ? OR symbol IS NULL
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+PROFILES_SQL = """
+    SELECT * FROM profiles 
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+
 @app.route('/api/profiles')
 def api_profiles():
     """
@@ -432,7 +1141,7 @@ def api_profiles():
         - count: Number of profiles returned
     """
     symbol_id = request.args.get('symbol', None)
-    limit = int(request.args.get('limit', 50))
+    limit = get_limit_arg(50)
     
     # If symbol specified, use symbol-specific database
     if symbol_id:
@@ -440,33 +1149,31 @@ def api_profiles():
         if conn is None:
             # Fall back to default database if symbol DB not found
             if not db_exists():
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'No database available'
-                }), 404
+                }, 404)
             conn = get_db_connection()
     else:
         # Use default database
         if not db_exists():
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Database not found'
-            }), 404
+            }, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
+        conn.begin_read()
+        cursor = tuple_cursor(conn)
         
         # Check if profiles table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='profiles'
-        """)
+        cursor.execute(TABLE_EXISTS_SQL, ('profiles',))
         
         if not cursor.fetchone():
             conn.close()
             # Return empty list if table doesn't exist (not an error)
-            return jsonify({
+            return json_response({
                 'success': True,
                 'profiles': [],
                 'count': 0,
@@ -475,25 +1182,14 @@ def api_profiles():
         
         # Query profiles
         if symbol_id:
-            cursor.execute("""
-                SELECT * FROM profiles 
-                WHERE symbol = ? OR symbol IS NULL
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (symbol_id, limit))
+            cursor.execute(PROFILES_BY_SYMBOL_SQL, (symbol_id, limit))
         else:
-            cursor.execute("""
-                SELECT * FROM profiles 
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (limit,))
+            cursor.execute(PROFILES_SQL, (limit,))
         
-        rows = cursor.fetchall()
+        profiles = rows_to_dicts(cursor)
         conn.close()
         
-        profiles = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'profiles': profiles,
             'count': len(profiles),
@@ -505,10 +1201,10 @@ def api_profiles():
             conn.close()
         except:
             pass
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -518,6 +1214,20 @@ def api_profiles():
 # STOIC Alignment: C↑ (new variable exposure) + O↑ (Hypersphere integration)
 # ============================================================================
 
+HYPERSPHERES_BY_SYMBOL_SQL = """
+    SELECT * FROM hyperspheres 
+    WHERE symbol = ? OR symbol IS NULL
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+HYPERSPHERES_SQL = """
+    SELECT * FROM hyperspheres 
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+
 @app.route('/api/hyperspheres')
 def api_hyperspheres():
     """
@@ -533,7 +1243,7 @@ def api_hyperspheres():
         - count: Number of hyperspheres returned
     """
     symbol_id = request.args.get('symbol', None)
-    limit = int(request.args.get('limit', 50))
+    limit = get_limit_arg(50)
     
     # If symbol specified, use symbol-specific database
     if symbol_id:
@@ -541,32 +1251,30 @@ def api_hyperspheres():
         if conn is None:
             # Fall back to default database
             if not db_exists():
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'No database available'
-                }), 404
+                }, 404)
             conn = get_db_connection()
     else:
         if not db_exists():
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Database not found'
-            }), 404
+            }, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
+        conn.begin_read()
+        cursor = tuple_cursor(conn)
         
         # Check if hyperspheres table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='hyperspheres'
-        """)
+        cursor.execute(TABLE_EXISTS_SQL, ('hyperspheres',))
         
         if not cursor.fetchone():
             conn.close()
             # Return empty list with schema hint if table doesn't exist
-            return jsonify({
+            return json_response({
                 'success': True,
                 'hyperspheres': [],
                 'count': 0,
@@ -586,25 +1294,14 @@ def api_hyperspheres():
         
         # Query hyperspheres
         if symbol_id:
-            cursor.execute("""
-                SELECT * FROM hyperspheres 
-                WHERE symbol = ? OR symbol IS NULL
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (symbol_id, limit))
+            cursor.execute(HYPERSPHERES_BY_SYMBOL_SQL, (symbol_id, limit))
         else:
-            cursor.execute("""
-                SELECT * FROM hyperspheres 
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (limit,))
+            cursor.execute(HYPERSPHERES_SQL, (limit,))
         
-        rows = cursor.fetchall()
+        hyperspheres = rows_to_dicts(cursor)
         conn.close()
         
-        hyperspheres = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'hyperspheres': hyperspheres,
             'count': len(hyperspheres),
@@ -616,10 +1313,10 @@ def api_hyperspheres():
             conn.close()
         except:
             pass
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -630,39 +1327,30 @@ def api_hyperspheres():
 def api_core():
     """Get core market data (OHLCV) - supports symbol parameter"""
     symbol_id = request.args.get('symbol', None)
-    timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 10))
+    timeframe = get_timeframe_arg()
+    limit = get_limit_arg(10)
     
     # Use symbol-specific or default database
     if symbol_id:
         conn, error = get_symbol_db_connection(symbol_id)
         if conn is None:
-            return jsonify({'success': False, 'error': error}), 404
+            return json_response({'success': False, 'error': error}, 404)
     else:
         if not db_exists():
-            return jsonify({'error': 'Database not found'}), 404
+            return json_response({'error': 'Database not found'}, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
-        table_name = f'core_{timeframe}' if timeframe in ['1m', '15m'] else 'core_15m'
+        cursor = tuple_cursor(conn)
+        cursor.execute(CORE_SQL[timeframe], {'digits': get_price_digits(symbol_id), 'limit': limit})
         
-        cursor.execute(f"""
-            SELECT timestamp, open, high, low, close, volume
-            FROM {table_name}
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data,
             'symbol': symbol_id
         })
@@ -672,46 +1360,36 @@ def api_core():
             conn.close()
         except:
             pass
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
 
 
 @app.route('/api/basic')
 def api_basic():
     """Get basic indicators data - supports symbol parameter"""
     symbol_id = request.args.get('symbol', None)
-    timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 10))
+    timeframe = get_timeframe_arg()
+    limit = get_limit_arg(10)
     
     if symbol_id:
         conn, error = get_symbol_db_connection(symbol_id)
         if conn is None:
-            return jsonify({'success': False, 'error': error}), 404
+            return json_response({'success': False, 'error': error}, 404)
     else:
         if not db_exists():
-            return jsonify({'error': 'Database not found'}), 404
+            return json_response({'error': 'Database not found'}, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
-        table_name = f'basic_{timeframe}' if timeframe in ['1m', '15m'] else 'basic_15m'
+        cursor = tuple_cursor(conn)
+        cursor.execute(BASIC_SQL[timeframe], (limit,))
         
-        cursor.execute(f"""
-            SELECT timestamp, atr_14, atr_50_avg, atr_ratio,
-                   ema_short, ema_medium, ema_distance, supertrend
-            FROM {table_name}
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data,
             'symbol': symbol_id
         })
@@ -721,7 +1399,15 @@ def api_basic():
             conn.close()
         except:
             pass
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+ADVANCED_SQL = """
+    SELECT * FROM advanced_indicators
+    WHERE timeframe = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
 
 
 @app.route('/api/advanced')
@@ -729,49 +1415,40 @@ def api_advanced():
     """Get advanced indicators data (V11.3) - supports symbol parameter"""
     symbol_id = request.args.get('symbol', None)
     timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 10))
+    limit = get_limit_arg(10)
     
     if symbol_id:
         conn, error = get_symbol_db_connection(symbol_id)
         if conn is None:
-            return jsonify({'success': False, 'error': error}), 404
+            return json_response({'success': False, 'error': error}, 404)
     else:
         if not db_exists():
-            return jsonify({'error': 'Database not found'}), 404
+            return json_response({'error': 'Database not found'}, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
+        conn.begin_read()
+        cursor = tuple_cursor(conn)
         
         # Check if advanced_indicators table exists
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='advanced_indicators'
-        """)
+        cursor.execute(TABLE_EXISTS_SQL, ('advanced_indicators',))
         
         if not cursor.fetchone():
             conn.close()
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Advanced indicators table not found. Run: python init_v11_3_advanced.py'
-            }), 404
+            }, 404)
         
-        cursor.execute("""
-            SELECT * FROM advanced_indicators
-            WHERE timeframe = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (timeframe, limit))
+        cursor.execute(ADVANCED_SQL, (timeframe, limit))
         
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data,
             'version': 'V11.3',
             'symbol': symbol_id
@@ -782,7 +1459,18 @@ def api_advanced():
             conn.close()
         except:
             pass
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+FIBONACCI_SQL = """
+    SELECT timestamp, current_fib_zone, in_golden_zone, zone_multiplier,
+           pivot_high, pivot_low, fib_level_0382, fib_level_0618,
+           fib_level_0786, distance_to_next_level
+    FROM fibonacci_data
+    WHERE timeframe = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
 
 
 @app.route('/api/fibonacci')
@@ -790,39 +1478,29 @@ def api_fibonacci():
     """Get Fibonacci zone data - supports symbol parameter"""
     symbol_id = request.args.get('symbol', None)
     timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 10))
+    limit = get_limit_arg(10)
     
     if symbol_id:
         conn, error = get_symbol_db_connection(symbol_id)
         if conn is None:
-            return jsonify({'success': False, 'error': error}), 404
+            return json_response({'success': False, 'error': error}, 404)
     else:
         if not db_exists():
-            return jsonify({'error': 'Database not found'}), 404
+            return json_response({'error': 'Database not found'}, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        cursor.execute("""
-            SELECT timestamp, current_fib_zone, in_golden_zone, zone_multiplier,
-                   pivot_high, pivot_low, fib_level_0382, fib_level_0618,
-                   fib_level_0786, distance_to_next_level
-            FROM fibonacci_data
-            WHERE timeframe = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (timeframe, limit))
+        cursor.execute(FIBONACCI_SQL, (timeframe, limit))
         
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data,
             'symbol': symbol_id
         })
@@ -832,7 +1510,18 @@ def api_fibonacci():
             conn.close()
         except:
             pass
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+ATH_SQL = """
+    SELECT timestamp, current_ath, current_close,
+           ath_distance_points, ath_distance_pct,
+           ath_multiplier, ath_zone, distance_from_ath_percentile
+    FROM ath_tracking
+    WHERE timeframe = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
 
 
 @app.route('/api/ath')
@@ -840,39 +1529,29 @@ def api_ath():
     """Get ATH tracking data - supports symbol parameter"""
     symbol_id = request.args.get('symbol', None)
     timeframe = request.args.get('timeframe', '15m')
-    limit = int(request.args.get('limit', 10))
+    limit = get_limit_arg(10)
     
     if symbol_id:
         conn, error = get_symbol_db_connection(symbol_id)
         if conn is None:
-            return jsonify({'success': False, 'error': error}), 404
+            return json_response({'success': False, 'error': error}, 404)
     else:
         if not db_exists():
-            return jsonify({'error': 'Database not found'}), 404
+            return json_response({'error': 'Database not found'}, 404)
         conn = get_db_connection()
     
     try:
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        cursor.execute("""
-            SELECT timestamp, current_ath, current_close,
-                   ath_distance_points, ath_distance_pct,
-                   ath_multiplier, ath_zone, distance_from_ath_percentile
-            FROM ath_tracking
-            WHERE timeframe = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (timeframe, limit))
+        cursor.execute(ATH_SQL, (timeframe, limit))
         
-        rows = cursor.fetchall()
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'timeframe': timeframe,
-            'count': len(data),
+            'count': count,
             'data': data,
             'symbol': symbol_id
         })
@@ -882,270 +1561,449 @@ def api_ath():
             conn.close()
         except:
             pass
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
 
 
 # ============================================================================
 # APEX V2.0 API ENDPOINTS
 # ============================================================================
 
+INDICATOR_GROUPS_SQL = """
+    SELECT id, name, description, is_active, display_order, created_at
+    FROM indicator_groups
+    ORDER BY display_order ASC
+"""
+
+
 @app.route('/api/indicator-groups')
 def api_indicator_groups():
     """Get indicator groups (Apex V2.0)"""
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, name, description, is_active, display_order, created_at
-            FROM indicator_groups
-            ORDER BY display_order ASC
-        """)
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
-            'success': True,
-            'count': len(data),
-            'data': data,
-            'version': 'Apex V2.0'
-        })
-        
+        return snapshot_response('indicator_groups', _indicator_groups_payload)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+def _indicator_groups_payload():
+    conn = get_db_connection()
+    try:
+        cursor = tuple_cursor(conn)
+        cursor.execute(INDICATOR_GROUPS_SQL)
+        data, count = shape_rows(cursor)
+    finally:
+        conn.close()
+    
+    return {
+        'success': True,
+        'count': count,
+        'data': data,
+        'version': 'Apex V2.0'
+    }
+
+
+GROUP_NAMES_TTL_SEC = 30.0
+GROUP_NAMES_SQL = "SELECT id, name FROM indicator_groups"
+
+@ttl_cache(GROUP_NAMES_TTL_SEC)
+def get_indicator_group_names():
+    """
+    {group_id: name} for the ~10 indicator groups. They rarely change, so the
+    indicator endpoints label rows from this instead of joining indicator_groups.
+    """
+    conn = get_db_connection()
+    try:
+        return dict(tuple_cursor(conn).execute(GROUP_NAMES_SQL))
+    finally:
+        conn.close()
+
+
+INDICATORS_BY_GROUP_SQL = """
+    SELECT i.id, i.name, i.display_name, i.description, 
+           i.logic_base_id, i.default_group_id, i.created_at
+    FROM indicators i
+    WHERE i.default_group_id = ?
+    ORDER BY i.id ASC
+    LIMIT ?
+"""
+
+INDICATORS_SQL = """
+    SELECT i.id, i.name, i.display_name, i.description, 
+           i.logic_base_id, i.default_group_id, i.created_at
+    FROM indicators i
+    ORDER BY i.default_group_id, i.id ASC
+    LIMIT ?
+"""
 
 
 @app.route('/api/indicators')
 def api_indicators():
     """Get indicators catalog (Apex V2.0)"""
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
-        group_id = request.args.get('group_id', None)
-        limit = int(request.args.get('limit', 200))
+        group_id = g.group_id
+        limit = get_limit_arg(200)
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        if group_id:
-            cursor.execute("""
-                SELECT i.id, i.name, i.display_name, i.description, 
-                       i.logic_base_id, i.default_group_id, i.created_at,
-                       ig.name as group_name
-                FROM indicators i
-                LEFT JOIN indicator_groups ig ON i.default_group_id = ig.id
-                WHERE i.default_group_id = ?
-                ORDER BY i.id ASC
-                LIMIT ?
-            """, (group_id, limit))
+        if group_id is not None:
+            cursor.execute(INDICATORS_BY_GROUP_SQL, (group_id, limit))
         else:
-            cursor.execute("""
-                SELECT i.id, i.name, i.display_name, i.description, 
-                       i.logic_base_id, i.default_group_id, i.created_at,
-                       ig.name as group_name
-                FROM indicators i
-                LEFT JOIN indicator_groups ig ON i.default_group_id = ig.id
-                ORDER BY i.default_group_id, i.id ASC
-                LIMIT ?
-            """, (limit,))
+            cursor.execute(INDICATORS_SQL, (limit,))
         
-        rows = cursor.fetchall()
+        columns = [col[0] for col in cursor.description] + ['group_name']
+        data = rows_to_dicts(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
+        # group_name from the cached lookup (was a LEFT JOIN)
+        group_names = get_indicator_group_names()
+        for item in data:
+            item['group_name'] = group_names.get(item['default_group_id'])
         
-        return jsonify({
+        count = len(data)
+        if columnar_requested():
+            data = dicts_to_columnar(columns, data)
+        
+        return json_response({
             'success': True,
-            'count': len(data),
+            'count': count,
             'data': data,
             'version': 'Apex V2.0'
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+# One statement per filter combination: (group_id given, active_only)
+INDICATOR_CONFIGS_SQL = {
+    (by_group, active_only): f"""
+        SELECT ic.id, ic.indicator_id, ic.scope, ic.is_active, 
+               ic.group_id, ic.display_order, ic.last_updated_at,
+               i.name as indicator_name, i.display_name, i.logic_base_id
+        FROM indicator_configs ic
+        JOIN indicators i ON ic.indicator_id = i.id
+        WHERE 1=1
+        {"AND ic.group_id = ?" if by_group else ""}
+        {"AND ic.is_active = 1" if active_only else ""}
+        ORDER BY ic.group_id, ic.display_order ASC LIMIT ?
+    """
+    for by_group in (False, True)
+    for active_only in (False, True)
+}
+
+# Same query with the JSON array built inside SQLite: one (count, text) row
+# comes back and goes straight into the response - no per-row Python objects
+INDICATOR_CONFIGS_JSON_SQL = {
+    (by_group, active_only): f"""
+        SELECT COUNT(*), json_group_array(json_object(
+            'id', id, 'indicator_id', indicator_id, 'scope', scope,
+            'is_active', is_active, 'group_id', group_id,
+            'display_order', display_order, 'last_updated_at', last_updated_at,
+            'indicator_name', indicator_name, 'display_name', display_name,
+            'logic_base_id', logic_base_id, 'group_name', group_name
+        ))
+        FROM (
+            SELECT ic.id, ic.indicator_id, ic.scope, ic.is_active, 
+                   ic.group_id, ic.display_order, ic.last_updated_at,
+                   i.name as indicator_name, i.display_name, i.logic_base_id,
+                   ig.name as group_name
+            FROM indicator_configs ic
+            JOIN indicators i ON ic.indicator_id = i.id
+            JOIN indicator_groups ig ON ic.group_id = ig.id
+            WHERE 1=1
+            {"AND ic.group_id = ?" if by_group else ""}
+            {"AND ic.is_active = 1" if active_only else ""}
+            ORDER BY ic.group_id, ic.display_order ASC LIMIT ?
+        )
+    """
+    for by_group in (False, True)
+    for active_only in (False, True)
+}
 
 
 @app.route('/api/indicator-configs')
 def api_indicator_configs():
     """Get indicator configs with full details (Apex V2.0)"""
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
-        group_id = request.args.get('group_id', None)
+        group_id = g.group_id
         active_only = request.args.get('active_only', 'false').lower() == 'true'
-        limit = int(request.args.get('limit', 200))
+        limit = get_limit_arg(200)
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        query = """
-            SELECT ic.id, ic.indicator_id, ic.scope, ic.is_active, 
-                   ic.group_id, ic.display_order, ic.last_updated_at,
-                   i.name as indicator_name, i.display_name, i.logic_base_id,
-                   ig.name as group_name
-            FROM indicator_configs ic
-            JOIN indicators i ON ic.indicator_id = i.id
-            JOIN indicator_groups ig ON ic.group_id = ig.id
-            WHERE 1=1
-        """
         params = []
-        
-        if group_id:
-            query += " AND ic.group_id = ?"
+        if group_id is not None:
             params.append(group_id)
-        
-        if active_only:
-            query += " AND ic.is_active = 1"
-        
-        query += " ORDER BY ic.group_id, ic.display_order ASC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if HAS_SQLITE_JSON and not columnar_requested():
+            cursor.execute(INDICATOR_CONFIGS_JSON_SQL[(group_id is not None, active_only)], params)
+            count, data_json = cursor.fetchone()
+            conn.close()
+            return Response(
+                sql_json_body(count, data_json, version='Apex V2.0'),
+                mimetype='application/json'
+            )
+        
+        cursor.execute(INDICATOR_CONFIGS_SQL[(group_id is not None, active_only)], params)
+        columns = [col[0] for col in cursor.description] + ['group_name']
+        data = rows_to_dicts(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
+        # group_name from the cached lookup; configs whose group no longer
+        # exists are dropped, as the old inner JOIN did
+        group_names = get_indicator_group_names()
+        data = [
+            dict(item, group_name=group_names[item['group_id']])
+            for item in data if item['group_id'] in group_names
+        ]
         
-        return jsonify({
+        count = len(data)
+        if columnar_requested():
+            data = dicts_to_columnar(columns, data)
+        
+        return json_response({
             'success': True,
-            'count': len(data),
+            'count': count,
             'data': data,
             'version': 'Apex V2.0'
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+EVALUATION_SETTINGS_SQL = """
+    SELECT id, bar_interval_mode, time_window_minutes, 
+           last_evaluation_at, created_at, updated_at
+    FROM evaluation_settings
+    WHERE id = 1
+"""
 
 
 @app.route('/api/evaluation-settings')
 def api_evaluation_settings():
     """Get evaluation settings (Apex V2.0)"""
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        cursor.execute("""
-            SELECT id, bar_interval_mode, time_window_minutes, 
-                   last_evaluation_at, created_at, updated_at
-            FROM evaluation_settings
-            WHERE id = 1
-        """)
+        cursor.execute(EVALUATION_SETTINGS_SQL)
         
         row = cursor.fetchone()
         conn.close()
         
         if row:
-            data = dict(row)
-            return jsonify({
+            data = rows_to_dicts(cursor, [row])[0]
+            return json_response({
                 'success': True,
                 'data': data,
                 'version': 'Apex V2.0'
             })
         else:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'No evaluation settings found'
-            }), 404
+            }, 404)
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+# Columns selectable via ?fields= (schema order). analysis_result is the
+# wide JSON text - leave it out of the list to fetch metadata only.
+AI_RESULT_FIELDS = (
+    'id', 'analysis_id', 'position_state_id', 'analysis_type',
+    'analysis_result', 'confidence', 'timestamp'
+)
+
+
+def get_fields_arg(allowed):
+    """?fields=a,b,c filtered to the allowed columns (in allowed order); None = all"""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    requested = {f.strip() for f in raw.split(',')}
+    return tuple(f for f in allowed if f in requested) or None
+
+
+@lru_cache(maxsize=None)
+def ai_analysis_results_sql(fields, by_symbol, by_timeframe):
+    """One statement per (field set, symbol given, timeframe given) - built once, then reused"""
+    columns = ', '.join(fields) if fields else '*'
+    return f"""
+        SELECT {columns} FROM ai_analysis_results WHERE 1=1
+        {"AND symbol = ?" if by_symbol else ""}
+        {"AND timeframe = ?" if by_timeframe else ""}
+        ORDER BY timestamp DESC LIMIT ?
+    """
 
 
 @app.route('/api/ai-analysis-results')
 def api_ai_analysis_results():
-    """Get AI analysis results (Apex V2.0)"""
+    """
+    Get AI analysis results (Apex V2.0).
+    ?fields=id,analysis_type,confidence,timestamp selects only those columns
+    (see AI_RESULT_FIELDS); unknown names are ignored, none given = all columns.
+    """
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
         symbol = request.args.get('symbol', None)
         timeframe = request.args.get('timeframe', None)
-        limit = int(request.args.get('limit', 20))
+        limit = get_limit_arg(20)
+        fields = get_fields_arg(AI_RESULT_FIELDS)
         
         conn = get_db_connection()
-        cursor = conn.cursor()
+        cursor = tuple_cursor(conn)
         
-        query = "SELECT * FROM ai_analysis_results WHERE 1=1"
         params = []
-        
         if symbol:
-            query += " AND symbol = ?"
             params.append(symbol)
-        
         if timeframe:
-            query += " AND timeframe = ?"
             params.append(timeframe)
-        
-        query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        cursor.execute(ai_analysis_results_sql(fields, bool(symbol), bool(timeframe)), params)
+        data, count = shape_rows(cursor)
         conn.close()
         
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+        return json_response({
             'success': True,
-            'count': len(data),
+            'count': count,
             'data': data,
             'version': 'Apex V2.0'
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+GROUP_SUMMARY_SQL = """
+    SELECT 
+        ig.id as group_id,
+        ig.name as group_name,
+        ig.description,
+        ig.is_active,
+        ig.display_order,
+        (SELECT COUNT(*) FROM indicator_configs ic
+         WHERE ic.group_id = ig.id) as total_indicators,
+        (SELECT COUNT(*) FROM indicator_configs ic
+         WHERE ic.group_id = ig.id AND ic.is_active = 1) as active_indicators
+    FROM indicator_groups ig
+    ORDER BY ig.display_order
+"""
+
+
+GROUP_SUMMARY_JSON_SQL = f"""
+    SELECT COUNT(*), json_group_array(json_object(
+        'group_id', group_id, 'group_name', group_name,
+        'description', description, 'is_active', is_active,
+        'display_order', display_order,
+        'total_indicators', total_indicators,
+        'active_indicators', active_indicators
+    ))
+    FROM ({GROUP_SUMMARY_SQL})
+"""
 
 
 @app.route('/api/group-summary')
 def api_group_summary():
     """Get summary of indicators per group (Apex V2.0)"""
     if not db_exists():
-        return jsonify({'error': 'Database not found'}), 404
+        return json_response({'error': 'Database not found'}, 404)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                ig.id as group_id,
-                ig.name as group_name,
-                ig.description,
-                ig.is_active,
-                ig.display_order,
-                COUNT(ic.id) as total_indicators,
-                SUM(CASE WHEN ic.is_active = 1 THEN 1 ELSE 0 END) as active_indicators
-            FROM indicator_groups ig
-            LEFT JOIN indicator_configs ic ON ic.group_id = ig.id
-            GROUP BY ig.id, ig.name, ig.description, ig.is_active, ig.display_order
-            ORDER BY ig.display_order
-        """)
-        
-        rows = cursor.fetchall()
+        return snapshot_response('group_summary', _group_summary_payload)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+
+def _group_summary_payload():
+    conn = get_db_connection()
+    try:
+        cursor = tuple_cursor(conn)
+        # Correlated counts are covering scans of idx_ic_group_active -
+        # no join materialization or 5-column GROUP BY
+        if HAS_SQLITE_JSON and not columnar_requested():
+            cursor.execute(GROUP_SUMMARY_JSON_SQL)
+            count, data_json = cursor.fetchone()
+            return sql_json_body(count, data_json, version='Apex V2.0')
+        
+        cursor.execute(GROUP_SUMMARY_SQL)
+        data, count = shape_rows(cursor)
+    finally:
         conn.close()
-        
-        data = [dict(row) for row in rows]
-        
-        return jsonify({
+    
+    return {
+        'success': True,
+        'count': count,
+        'data': data,
+        'version': 'Apex V2.0'
+    }
+
+
+STATUS_CORE_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM core_15m WHERE timeframe='1m'),
+        (SELECT COUNT(*) FROM core_15m WHERE timeframe='15m')
+"""
+
+STATUS_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM core_15m WHERE timeframe='1m'),
+        (SELECT COUNT(*) FROM core_15m WHERE timeframe='15m'),
+        (SELECT COUNT(*) FROM advanced_indicators WHERE timeframe='1m'),
+        (SELECT COUNT(*) FROM advanced_indicators WHERE timeframe='15m')
+"""
+
+# Whether the default database has advanced_indicators - a schema fact that
+# only changes on migration, so it is probed at startup (None = not yet)
+# rather than discovered per /api/status hit. POST /api/admin/refresh-schema
+# re-probes without a restart.
+HAS_ADVANCED_INDICATORS = None
+
+
+def probe_advanced_indicators():
+    """Check the default database for advanced_indicators and cache the answer"""
+    global HAS_ADVANCED_INDICATORS
+    
+    conn = get_db_connection()
+    try:
+        cursor = conn.execute(TABLE_EXISTS_SQL, ('advanced_indicators',))
+        HAS_ADVANCED_INDICATORS = cursor.fetchone() is not None
+    finally:
+        conn.close()
+    return HAS_ADVANCED_INDICATORS
+
+
+@app.route('/api/admin/refresh-schema', methods=['POST'])
+def api_refresh_schema():
+    """Re-probe cached schema flags after a migration"""
+    if not db_exists():
+        return json_response({'success': False, 'error': 'Database not found'}, 404)
+    
+    try:
+        return json_response({
             'success': True,
-            'count': len(data),
-            'data': data,
-            'version': 'Apex V2.0'
+            'advanced_indicators_table': probe_advanced_indicators()
         })
-        
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
 
 
 @app.route('/api/status')
@@ -1153,29 +2011,24 @@ def api_status():
     """Check system status - enhanced with symbol database info"""
     global collector, collectors, multi_collector
     
-    # Determine collector status
-    if multi_collector:
-        collector_running = multi_collector.running
-        collector_type = 'multi'
-        collector_stats = multi_collector.get_stats() if multi_collector.running else None
-    elif collectors:
-        collector_running = any(c.running for c in collectors.values())
-        collector_type = 'legacy_multi'
-        collector_stats = None
-    elif collector:
-        collector_running = collector.running
-        collector_type = 'legacy_single'
-        collector_stats = None
-    else:
-        collector_running = False
-        collector_type = 'none'
-        collector_stats = None
+    # Collector + symbol snapshots from the refresher thread. A forked worker
+    # inherits the snapshot but not the thread, so start one here if this
+    # process has none, and refresh inline until it has run once.
+    if _REFRESHER_PID != os.getpid():
+        start_status_refresher()
+        refresh_collector_status()
+        refresh_symbol_status()
+    if COLLECTOR_STATUS is None:
+        refresh_collector_status()
+    if not SYMBOL_STATUS:
+        refresh_symbol_status()
+    collector_running, collector_type, collector_stats = COLLECTOR_STATUS
     
     status = {
         'database_connected': db_exists(),
         'collector_running': collector_running,
         'collector_type': collector_type,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'timestamp': STATUS_TIMESTAMP,
         'version': 'V11.3',
         'multi_collector_available': MULTI_COLLECTOR_AVAILABLE,
         'advanced_collector': ADVANCED_COLLECTOR_AVAILABLE
@@ -1185,46 +2038,36 @@ def api_status():
         status['collector_stats'] = collector_stats
     
     # Add symbol database status
-    symbol_status = {}
-    for sym_id, config in SYMBOL_DATABASES.items():
-        db_path = config['db_path']
-        exists = os.path.exists(db_path)
-        counts = get_symbol_record_counts(sym_id) if exists else {'records_1m': 0, 'records_15m': 0}
-        symbol_status[sym_id] = {
-            'name': config['name'],
-            'available': exists,
-            'records_1m': counts.get('records_1m', 0),
-            'records_15m': counts.get('records_15m', 0)
-        }
-    status['symbol_databases'] = symbol_status
+    status['symbol_databases'] = {
+        sym_id: asdict(sym_status) for sym_id, sym_status in SYMBOL_STATUS.items()
+    }
     
     if db_exists():
         try:
+            has_advanced = HAS_ADVANCED_INDICATORS
+            if has_advanced is None:
+                has_advanced = probe_advanced_indicators()
+            
             conn = get_db_connection()
+            conn.begin_read()
             cursor = conn.cursor()
             
-            cursor.execute("SELECT COUNT(*) as count FROM core_15m WHERE timeframe='1m'")
-            count_1m = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM core_15m WHERE timeframe='15m'")
-            count_15m = cursor.fetchone()['count']
-            
-            # Check for advanced indicators table
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='advanced_indicators'
-            """)
-            has_advanced = cursor.fetchone() is not None
-            
+            # All counts in one statement (a query naming a missing table
+            # fails at prepare time, hence the cached schema flag)
+            adv_count_1m = 0
+            adv_count_15m = 0
             if has_advanced:
-                cursor.execute("SELECT COUNT(*) as count FROM advanced_indicators WHERE timeframe='1m'")
-                adv_count_1m = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM advanced_indicators WHERE timeframe='15m'")
-                adv_count_15m = cursor.fetchone()['count']
-            else:
-                adv_count_1m = 0
-                adv_count_15m = 0
+                try:
+                    cursor.execute(STATUS_COUNTS_SQL)
+                    count_1m, count_15m, adv_count_1m, adv_count_15m = cursor.fetchone()
+                except sqlite3.OperationalError as e:
+                    if 'advanced_indicators' not in str(e):
+                        raise
+                    # Table dropped since the probe
+                    has_advanced = probe_advanced_indicators()
+            if not has_advanced:
+                cursor.execute(STATUS_CORE_COUNTS_SQL)
+                count_1m, count_15m = cursor.fetchone()
             
             conn.close()
             
@@ -1251,15 +2094,19 @@ def api_status():
         except Exception as e:
             status['database_error'] = str(e)
     
-    return jsonify(status)
+    return json_response(status)
 
 
 # ============================================================================
 # STARTUP
 # ============================================================================
 
-def startup_checks():
-    """Run startup checks"""
+def startup_checks(start_collectors=True):
+    """
+    Run startup checks.
+    start_collectors=False checks the databases and creates the API indexes
+    but leaves MT5 collection to another process (multi-worker WSGI setups).
+    """
     global collector
     
     print("\n" + "="*70)
@@ -1274,11 +2121,18 @@ def startup_checks():
         exists = os.path.exists(db_path)
         status = "✓ FOUND" if exists else "✗ NOT FOUND"
         if exists:
+            try:
+                ensure_api_indexes(db_path)
+            except Exception as e:
+                print(f"  ⚠️  {sym_id}: could not create API indexes: {e}")
             counts = get_symbol_record_counts(sym_id)
             print(f"  {sym_id:12s} {status:12s} | 1m: {counts['records_1m']:>6} | 15m: {counts['records_15m']:>6}")
         else:
             print(f"  {sym_id:12s} {status}")
     
+    # Keep the /api/status symbol snapshot current in the background
+    start_status_refresher()
+    
     print()
     
     if db_exists():
@@ -1291,11 +2145,7 @@ def startup_checks():
             cursor.execute("SELECT COUNT(*) as count FROM core_15m WHERE timeframe='15m'")
             count_15m = cursor.fetchone()['count']
             
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='advanced_indicators'
-            """)
-            has_advanced = cursor.fetchone() is not None
+            has_advanced = probe_advanced_indicators()
             
             if has_advanced:
                 cursor.execute("SELECT COUNT(*) as count FROM advanced_indicators WHERE timeframe='15m'")
@@ -1316,7 +2166,9 @@ def startup_checks():
         print(f"✗ Default database not found: {DB_PATH}")
         print("  Run: python init.py")
     
-    if COLLECTOR_ENABLED and MULTI_COLLECTOR_AVAILABLE:
+    if not start_collectors:
+        print("\n⚠️  Collectors not started by this process (API only)")
+    elif COLLECTOR_ENABLED and MULTI_COLLECTOR_AVAILABLE:
         print(f"\n[STARTUP] Initializing multi-symbol collector...")
         
         # Build config for available databases
@@ -1425,12 +2277,31 @@ atexit.register(shutdown)
 # MAIN
 # ============================================================================
 
+# Production WSGI server. Connections come from the per-thread pool, so each
+# server thread reuses its own SQLite handles. Multi-process alternative
+# (see wsgi.py - API only, collectors run elsewhere):
+#   gunicorn -w 2 -k gthread --threads 8 --preload -b 0.0.0.0:5000 wsgi:app
+SERVER_HOST = '0.0.0.0'
+SERVER_PORT = 5000
+SERVER_THREADS = 16
+
 if __name__ == '__main__':
     startup_checks()
     
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=False,
-        use_reloader=False
-    )
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    
+    if serve:
+        print(f"Serving with waitress ({SERVER_THREADS} threads)")
+        serve(app, host=SERVER_HOST, port=SERVER_PORT, threads=SERVER_THREADS)
+    else:
+        print("⚠️  waitress not installed - using Flask dev server (pip install waitress)")
+        app.run(
+            host=SERVER_HOST,
+            port=SERVER_PORT,
+            debug=False,
+            use_reloader=False,
+            threaded=True
+        )
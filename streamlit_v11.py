@@ -16,13 +16,32 @@ import base64
 import io
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, Queue
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 import anthropic
+import numpy as np
 from PIL import Image
 import mss
 import mss.tools
 
+# SIMD base64 (AVX2/AVX-512 kernels) for the multi-MB screenshot payloads;
+# stdlib base64 is the fallback.
+try:
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Configure page
 st.set_page_config(
     page_title="MT5 Meta Agent V11 - Vision",
@@ -35,10 +54,48 @@ st.set_page_config(
 DB_PATH = os.environ.get('DB_PATH', 'mt5_intelligence.db')
 FLASK_API_URL = os.environ.get('FLASK_API_URL', 'http://localhost:5000/api/v11')
 
+# Vision payload format. JPEG q85 is several times smaller and faster to
+# encode than PNG for chart screenshots; set SCREENSHOT_FORMAT=PNG to get
+# lossless captures when debugging.
+SCREENSHOT_FORMAT = os.environ.get('SCREENSHOT_FORMAT', 'JPEG').upper()
+JPEG_QUALITY = 85
+SCREENSHOT_MEDIA_TYPE = 'image/png' if SCREENSHOT_FORMAT == 'PNG' else 'image/jpeg'
+
+# Chart rectangle to capture, relative to the monitor: "left,top,width,height".
+# Point it at the chart window so only chart pixels are grabbed, encoded
+# and uploaded rather than the whole desktop.
+# A malformed value falls back to 0,0,1920,1080, which capture clips to the
+# monitor, instead of stopping the app at import.
+FALLBACK_CHART_REGION = '0,0,1920,1080'
+
+
+def parse_chart_region(raw: str) -> Dict[str, int]:
+    """Parse "left,top,width,height" into a region dict, warning and falling back when malformed"""
+    keys = ('left', 'top', 'width', 'height')
+    try:
+        values = [int(v) for v in raw.split(',')]
+        if len(values) != 4 or min(values[:2]) < 0 or min(values[2:]) < 1:
+            raise ValueError("expected four ints: left,top >= 0 and width,height >= 1")
+    except ValueError as e:
+        print(f"[V11] Invalid CHART_REGION {raw!r} ({e}) - using {FALLBACK_CHART_REGION}")
+        values = [int(v) for v in FALLBACK_CHART_REGION.split(',')]
+    return dict(zip(keys, values))
+
+
+DEFAULT_CHART_REGION = parse_chart_region(os.environ.get('CHART_REGION', FALLBACK_CHART_REGION))
+
+# Claude Vision resizes to ~1568 px on the long edge anyway; shrinking first
+# saves encode, base64 and upload work on large / high-DPI monitors.
+VISION_MAX_EDGE = 1568
+
 # =============================================================================
 # AUTO-INITIALIZE DATABASE (ALWAYS RUNS)
 # =============================================================================
 
+# Number of default rows seeded into evaluation_settings below; once they are
+# all present the database is considered initialised.
+SEED_SETTINGS_COUNT = 4
+
 def ensure_database_exists():
     """Initialize database tables - handles old schemas and creates missing tables"""
     print(f"[V11] Ensuring database exists: {DB_PATH}")
@@ -58,6 +115,13 @@ def ensure_database_exists():
                     conn.close()
                     os.remove(DB_PATH)
                     print("[V11] Old database removed")
+                elif cursor.execute("SELECT COUNT(*) FROM evaluation_settings").fetchone()[0] >= SEED_SETTINGS_COUNT:
+                    # Already initialised - the DDL + seeds below run in one
+                    # transaction, so seeded settings mean every table exists.
+                    # Skips the whole script on every streamlit rerun.
+                    conn.close()
+                    print("[V11] Database already initialised")
+                    return
             conn.close()
         except Exception as e:
             print(f"[V11] Schema check failed: {e}")
@@ -72,8 +136,16 @@ def ensure_database_exists():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    # Core tables - CREATE IF NOT EXISTS handles idempotency
+    # WAL + NORMAL so the single commit below costs one sync, not one per statement
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    
+    # Core tables - CREATE IF NOT EXISTS handles idempotency.
+    # executescript() commits before it runs, so the transaction is opened
+    # inside the script itself: all DDL and seed rows land in one commit.
     cursor.executescript("""
+        BEGIN IMMEDIATE;
+        
         -- Position State (MT5 Import)
         CREATE TABLE IF NOT EXISTS position_state (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -254,9 +326,10 @@ def ensure_database_exists():
         -- Default complex
         INSERT OR IGNORE INTO api_complexes (complex_id, name, consensus_threshold)
         VALUES ('[COMPLEX_ALPHA_001]', 'Alpha Complex', 0.75);
+        
+        COMMIT;
     """)
     
-    conn.commit()
     conn.close()
     print("[V11] Database tables ready!")
 
@@ -290,45 +363,142 @@ st.markdown("""
 # DATABASE FUNCTIONS
 # =============================================================================
 
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+def dumps_json(payload) -> str:
+    """JSON-encode a payload for a TEXT column (orjson when installed).
+
+    Returned as str, not bytes - sqlite3 would store bytes as a BLOB.
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(payload, default=str).decode('utf-8')
+    return json.dumps(payload, default=str)
+
+
+# One read-write connection plus a few read-only ones. With WAL, readers
+# never block behind insert_* and insert_* never waits on a reader.
+POOL_READERS = 4
+BUSY_TIMEOUT_MS = 5000
+
+# Prepared-statement cache per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# SQL kept as module constants so every call passes identical text and
+# hits the connection's statement cache instead of re-preparing.
+# Only the columns calculate_indicators(), the vision prompt and main() read
+SQL_LATEST_POSITION_STATE = """
+    SELECT id, timestamp, price, position_size, pnl,
+           sl1, sl2, sl3, sl4, sl5,
+           tp1, tp2, tp3, tp4, tp5
+    FROM position_state
+    WHERE symbol = ? AND timeframe = ?
+    ORDER BY timestamp DESC LIMIT 1
+"""
+
+SQL_INSERT_STREAMLIT_OUTPUT = """
+    INSERT INTO streamlit_outputs (
+        position_state_id, indicator_group, indicator_values, visual_snapshot
+    ) VALUES (?, ?, ?, ?)
+"""
+
+SQL_INSERT_AI_ANALYSIS = """
+    INSERT INTO ai_analysis_results (
+        analysis_id, position_state_id, analysis_type, analysis_result,
+        confidence, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Turns the ORDER BY timestamp DESC LIMIT 1 lookup into an index seek
+SQL_POSITION_STATE_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_ps_symbol_tf_ts
+    ON position_state(symbol, timeframe, timestamp DESC)
+"""
+
+
+def _open_connection(readonly: bool) -> sqlite3.Connection:
+    """Open and configure one pooled connection"""
+    if readonly:
+        # as_uri() escapes '#', '?' and '%' in the path and gives file:///C:/... on Windows
+        uri = Path(DB_PATH).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA query_only=1")
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SQL_POSITION_STATE_INDEX)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
     return conn
 
 
+@st.cache_resource
+def _get_pool() -> Dict[str, Queue]:
+    """Build the connection pool once; cached so Streamlit reruns share it.
+
+    The RW connection is opened first so WAL is set before any reader
+    attaches.
+    """
+    pool = {'rw': Queue(maxsize=1), 'ro': Queue(maxsize=POOL_READERS)}
+    pool['rw'].put(_open_connection(readonly=False))
+    for _ in range(POOL_READERS):
+        pool['ro'].put(_open_connection(readonly=True))
+    return pool
+
+
+@contextmanager
+def get_db(readonly: bool = True):
+    """Check a connection out of the pool for the duration of a with-block.
+
+    Autocommit mode (isolation_level=None); wrap writes in 'with conn:'.
+    The connection goes back to the pool afterwards - never close it.
+    Waits up to BUSY_TIMEOUT_MS for a free connection, so a nested RW
+    checkout or a leaked connection fails instead of hanging the script.
+    """
+    queue = _get_pool()['ro' if readonly else 'rw']
+    try:
+        conn = queue.get(timeout=BUSY_TIMEOUT_MS / 1000)
+    except Empty:
+        raise sqlite3.OperationalError(
+            f"no {'read-only' if readonly else 'read-write'} connection free in the pool "
+            f"after {BUSY_TIMEOUT_MS} ms (nested or leaked get_db checkout?)"
+        ) from None
+    try:
+        yield conn
+    finally:
+        queue.put(conn)
+
+
 def get_latest_position_state(symbol: str = 'XAUG26.sim', timeframe: str = 'M1') -> Optional[Dict]:
     """Get latest position state from database"""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM position_state 
-        WHERE symbol = ? AND timeframe = ?
-        ORDER BY timestamp DESC LIMIT 1
-    """, (symbol, timeframe))
-    
-    row = cursor.fetchone()
-    conn.close()
+    with get_db(readonly=True) as conn:
+        row = conn.execute(SQL_LATEST_POSITION_STATE, (symbol, timeframe)).fetchone()
     
     return dict(row) if row else None
 
 
 def get_m15_context(symbol: str = 'XAUG26.sim') -> Optional[Dict]:
     """Get latest M15 position state for higher timeframe context"""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM position_state 
-        WHERE symbol = ? AND timeframe = 'M15'
-        ORDER BY timestamp DESC LIMIT 1
-    """, (symbol,))
-    
-    row = cursor.fetchone()
-    conn.close()
+    # Same statement as get_latest_position_state -> shares its cache entry
+    return get_latest_position_state(symbol, 'M15')
+
+
+def get_contexts(symbol: str = 'XAUG26.sim', timeframe: str = 'M1') -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Get (latest position state, latest M15 context) in one checkout.
+
+    Both lookups run the same cached statement on one pooled connection,
+    so the second one hits a warm page cache instead of a fresh checkout.
+    """
+    with get_db(readonly=True) as conn:
+        row = conn.execute(SQL_LATEST_POSITION_STATE, (symbol, timeframe)).fetchone()
+        if timeframe == 'M15':
+            m15_row = row
+        else:
+            m15_row = conn.execute(SQL_LATEST_POSITION_STATE, (symbol, 'M15')).fetchone()
     
-    return dict(row) if row else None
+    return (dict(row) if row else None), (dict(m15_row) if m15_row else None)
 
 
 def insert_streamlit_output(
@@ -338,20 +508,29 @@ def insert_streamlit_output(
     visual_snapshot: Optional[str] = None
 ) -> int:
     """Insert Streamlit output to database"""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO streamlit_outputs (
-            position_state_id, indicator_group, indicator_values, visual_snapshot
-        ) VALUES (?, ?, ?, ?)
-    """, (position_state_id, indicator_group, indicator_values, visual_snapshot))
-    
-    output_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    return insert_streamlit_outputs_batch(
+        [(position_state_id, indicator_group, indicator_values, visual_snapshot)])
+
+
+def insert_streamlit_outputs_batch(rows: List[Tuple]) -> int:
+    """Insert many streamlit_outputs rows in one transaction.
+
+    rows: (position_state_id, indicator_group, indicator_values,
+    visual_snapshot) tuples. executemany reuses one prepared statement and
+    the WAL is synced once at COMMIT. Returns the id of the last row.
+    """
+    with get_db(readonly=False) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(SQL_INSERT_STREAMLIT_OUTPUT, rows)
+            # executemany leaves lastrowid unset - read it before COMMIT
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
     
-    return output_id
+    return last_id
 
 
 def insert_ai_analysis(
@@ -362,28 +541,29 @@ def insert_ai_analysis(
     confidence: float
 ) -> int:
     """Insert AI analysis result to database"""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO ai_analysis_results (
-            analysis_id, position_state_id, analysis_type, analysis_result, 
-            confidence, timestamp
-        ) VALUES (?, ?, ?, ?, ?, ?)
-    """, (analysis_id, position_state_id, analysis_type, analysis_result, 
-          confidence, datetime.utcnow().isoformat()))
-    
-    result_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with get_db(readonly=False) as conn, conn:
+        cursor = conn.execute(SQL_INSERT_AI_ANALYSIS, (
+            analysis_id, position_state_id, analysis_type, analysis_result,
+            confidence, datetime.utcnow().isoformat()))
     
-    return result_id
+    return cursor.lastrowid
 
 
 # =============================================================================
 # SCREENSHOT CAPTURE
 # =============================================================================
 
+def bgra_to_rgb(screenshot) -> np.ndarray:
+    """Repack an mss BGRA grab into a contiguous (h, w, 3) RGB array.
+
+    The reversed channel slice [..., 2::-1] picks R, G, B and drops the pad
+    byte in one vectorised gather over a zero-copy view of the grab buffer.
+    """
+    bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+        screenshot.height, screenshot.width, 4)
+    return np.ascontiguousarray(bgra[..., 2::-1])
+
+
 def capture_screen_region(
     left: int = 0, 
     top: int = 0, 
@@ -411,72 +591,84 @@ def capture_screen_region(
         screenshot = sct.grab(region)
         
         # Convert to PIL Image
-        img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+        img = Image.fromarray(bgra_to_rgb(screenshot), "RGB")
         
         return img
 
 
+def b64encode_str(data) -> str:
+    """Base64-encode bytes to an ASCII str, via pybase64 when installed"""
+    if HAS_PYBASE64:
+        return pybase64.b64encode(data).decode('ascii')
+    return base64.b64encode(data).decode('ascii')
+
+
 def image_to_base64(img: Image.Image, format: str = 'PNG') -> str:
     """Convert PIL Image to base64 string"""
     buffer = io.BytesIO()
     img.save(buffer, format=format)
-    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    # getbuffer() is a memoryview over the BytesIO storage - no extra
+    # full-size copy like getvalue()
+    with buffer.getbuffer() as view:
+        return b64encode_str(view)
 
 
 def capture_chart_screenshot(
     monitor: int = 1,
     region: Optional[Dict[str, int]] = None
-) -> Tuple[Image.Image, str]:
+) -> Tuple[bytes, str]:
     """
     Capture chart screenshot from specified monitor/region.
-    Returns PIL Image and base64 string.
+    Always grabs a sub-rectangle (DEFAULT_CHART_REGION when none is given),
+    clipped to the monitor.
+    Returns encoded image bytes in SCREENSHOT_FORMAT (st.image displays
+    them directly) and base64 string.
     """
-    if region:
-        img = capture_screen_region(
-            left=region.get('left', 0),
-            top=region.get('top', 0),
-            width=region.get('width', 1920),
-            height=region.get('height', 1080),
-            monitor=monitor
-        )
-    else:
-        # Default: full monitor capture
-        with mss.mss() as sct:
-            mon = sct.monitors[monitor] if monitor <= len(sct.monitors) else sct.monitors[1]
-            screenshot = sct.grab(mon)
-            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+    region = region or DEFAULT_CHART_REGION
+    with mss.mss() as sct:
+        mon = sct.monitors[monitor] if monitor < len(sct.monitors) else sct.monitors[1]
+        left = min(max(region.get('left', 0), 0), mon["width"] - 1)
+        top = min(max(region.get('top', 0), 0), mon["height"] - 1)
+        grab_region = {
+            "left": mon["left"] + left,
+            "top": mon["top"] + top,
+            "width": max(1, min(region.get('width', mon["width"]), mon["width"] - left)),
+            "height": max(1, min(region.get('height', mon["height"]), mon["height"] - top))
+        }
+        screenshot = sct.grab(grab_region)
+    
+    rgb = bgra_to_rgb(screenshot)
+    img = None
+    if max(screenshot.size) > VISION_MAX_EDGE:
+        img = Image.fromarray(rgb, "RGB")
+        # Pillow < 9.1 has no Image.Resampling
+        resample = getattr(Image, 'Resampling', Image).LANCZOS
+        img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE), resample)
     
-    base64_str = image_to_base64(img)
+    if SCREENSHOT_FORMAT == 'PNG' and img is None:
+        # Flat memoryview over the RGB array - to_png slices scanlines out
+        # of it without a tobytes() copy of the whole frame
+        image_bytes = mss.tools.to_png(rgb.reshape(-1).data, screenshot.size)
+    else:
+        if img is None:
+            img = Image.fromarray(rgb, "RGB")
+        buffer = io.BytesIO()
+        if SCREENSHOT_FORMAT == 'PNG':
+            img.save(buffer, 'PNG')
+        else:
+            img.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=False)
+        image_bytes = buffer.getvalue()
+    base64_str = b64encode_str(image_bytes)
     
-    return img, base64_str
+    return image_bytes, base64_str
 
 
 # =============================================================================
 # CLAUDE VISION API
 # =============================================================================
 
-def analyze_chart_with_vision(
-    image_base64: str,
-    position_state: Optional[Dict] = None,
-    m15_context: Optional[Dict] = None,
-    custom_prompt: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Analyze chart screenshot using Claude Vision API.
-    
-    Returns:
-        {
-            'decision': 1/2/3,
-            'analysis': str,
-            'confidence': float,
-            'key_levels': {...},
-            'raw_response': str
-        }
-    """
-    client = anthropic.Anthropic()
-    
-    # Build system prompt
-    system_prompt = """You are an expert technical analyst for gold futures trading (XAUG26.sim).
+# Vision prompt pieces - fixed text, built once rather than per call
+SYSTEM_PROMPT = """You are an expert technical analyst for gold futures trading (XAUG26.sim).
 Analyze the provided chart screenshot and give a trading decision.
 
 Your response MUST be in this exact JSON format:
@@ -504,6 +696,137 @@ Focus on:
 - Volume if visible
 - Any visible indicators"""
 
+BASE_INSTRUCTION = "Analyze this chart and provide your trading decision."
+
+# Reused for pulling the JSON object out of the model's reply
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Clients are cached with st.cache_resource rather than module globals:
+# Streamlit re-executes this module on every rerun, which would otherwise
+# rebuild them (and their keep-alive connection pools) each time.
+@st.cache_resource
+def get_anthropic_client() -> anthropic.Anthropic:
+    """Shared Anthropic client - its httpx pool keeps the TLS socket alive"""
+    return anthropic.Anthropic()
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared requests session for the Flask API (HTTP keep-alive)"""
+    return requests.Session()
+
+
+@st.cache_resource
+def get_io_pool() -> ThreadPoolExecutor:
+    """Worker threads for the blocking Vision / Flask API network calls"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='v11-io')
+
+
+# How often a job fragment reruns to check on its in-flight background job
+JOB_POLL_SEC = 0.5
+
+# st.fragment is st.experimental_fragment before Streamlit 1.37
+_fragment = getattr(st, 'fragment', None) or st.experimental_fragment
+
+
+def job_pending(key: str) -> bool:
+    """True while the background job stored under session_state[key] runs.
+    'vision_job' holds (cycle_id, state, future), 'complex_job' the future."""
+    job = st.session_state.get(key)
+    if job is None:
+        return False
+    future = job[2] if isinstance(job, tuple) else job
+    return not future.done()
+
+
+def run_job_fragment(key: str, body, *args):
+    """
+    Run body as a fragment that reruns on its own every JOB_POLL_SEC while
+    the job under session_state[key] is pending. Only the fragment polls;
+    the rest of the page (DB reads, indicators) is not redrawn until body
+    picks up the result and reruns the full app.
+    """
+    run_every = JOB_POLL_SEC if job_pending(key) else None
+    _fragment(run_every=run_every)(body)(*args)
+
+
+def collect_vision_job(show_screenshot: bool):
+    """Vision job fragment: progress while running; once done, store the
+    result and rerun the page so main() displays it."""
+    if job_pending('vision_job'):
+        if show_screenshot and 'last_screenshot' in st.session_state:
+            st.image(st.session_state['last_screenshot'], caption="Captured Chart",
+                     use_column_width=True)
+        st.info("Analyzing with Claude Vision...")
+        return
+    if 'vision_job' not in st.session_state:
+        return
+    
+    cycle_id, job_state, future = st.session_state.pop('vision_job')
+    result = future.result()
+    
+    st.session_state['last_analysis'] = result
+    st.session_state['last_analysis_cycle'] = cycle_id
+    
+    # Store to database - against the state the capture was made with
+    analysis_id = None
+    if job_state.get('id'):
+        from id_gen_api import IDGenerator
+        id_gen = IDGenerator.get_instance(DB_PATH)
+        analysis_id = id_gen.generate_analysis_id('V')
+        
+        insert_ai_analysis(
+            analysis_id=analysis_id,
+            position_state_id=job_state['id'],
+            analysis_type='VISION',
+            analysis_result=dumps_json(result),
+            confidence=result.get('confidence', 0)
+        )
+    
+    st.session_state['vision_result'] = (result, analysis_id)
+    st.rerun()
+
+
+def collect_complex_job():
+    """API complex job fragment: progress while running; once done, store
+    (error, response) and rerun the page so main() displays it."""
+    if job_pending('complex_job'):
+        st.info("Running API complex...")
+        return
+    if 'complex_job' not in st.session_state:
+        return
+    
+    future = st.session_state.pop('complex_job')
+    error = future.exception()
+    st.session_state['complex_result'] = (error, None if error is not None else future.result())
+    st.rerun()
+
+
+def analyze_chart_with_vision(
+    image_base64: str,
+    position_state: Optional[Dict] = None,
+    m15_context: Optional[Dict] = None,
+    custom_prompt: Optional[str] = None,
+    client: Optional[anthropic.Anthropic] = None
+) -> Dict[str, Any]:
+    """
+    Analyze chart screenshot using Claude Vision API.
+    Pass client when calling from a worker thread - st.cache_resource
+    lookups belong on the script thread.
+    
+    Returns:
+        {
+            'decision': 1/2/3,
+            'analysis': str,
+            'confidence': float,
+            'key_levels': {...},
+            'raw_response': str
+        }
+    """
+    if client is None:
+        client = get_anthropic_client()
+    
     # Build user message
     content = []
     
@@ -512,13 +835,13 @@ Focus on:
         "type": "image",
         "source": {
             "type": "base64",
-            "media_type": "image/png",
+            "media_type": SCREENSHOT_MEDIA_TYPE,
             "data": image_base64
         }
     })
     
     # Build text context
-    text_parts = ["Analyze this chart and provide your trading decision."]
+    text_parts = [BASE_INSTRUCTION]
     
     if position_state:
         text_parts.append(f"\nCurrent M1 Context:")
@@ -545,7 +868,7 @@ Focus on:
         response = client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=1024,
-            system=system_prompt,
+            system=SYSTEM_PROMPT,
             messages=[
                 {"role": "user", "content": content}
             ]
@@ -553,16 +876,14 @@ Focus on:
         
         raw_response = response.content[0].text
         
-        # Parse JSON response
+        # Parse JSON response - decode the first object starting at the
+        # first '{' in one linear pass; any trailing prose is ignored
+        start = raw_response.find('{')
         try:
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', raw_response)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                result = {"decision": 2, "analysis": raw_response, "confidence": 0.5}
-        except json.JSONDecodeError:
+            if start < 0:
+                raise ValueError("no JSON object in response")
+            result, _ = _JSON_DECODER.raw_decode(raw_response, start)
+        except ValueError:
             result = {"decision": 2, "analysis": raw_response, "confidence": 0.5}
         
         result['raw_response'] = raw_response
@@ -582,60 +903,52 @@ Focus on:
 # INDICATOR CALCULATIONS
 # =============================================================================
 
+# Level keys read by calculate_indicators - built once, not per call
+_SL_KEYS = ('sl1', 'sl2', 'sl3', 'sl4', 'sl5')
+_TP_KEYS = ('tp1', 'tp2', 'tp3', 'tp4', 'tp5')
+
+
 def calculate_indicators(position_state: Dict) -> Dict[str, Any]:
     """
     Calculate technical indicators from position state.
     Returns indicator groups for storage.
     """
-    indicators = {
+    get = position_state.get
+    price = get('price')
+    size = get('position_size', 0)
+    
+    # Risk metrics - distances only when both levels are set
+    risk = abs(price - sl1) if price and (sl1 := get('sl1')) else None
+    reward = abs(tp1 - price) if price and (tp1 := get('tp1')) else None
+    
+    return {
         "price_levels": {
-            "current_price": position_state.get('price'),
-            "sl_levels": [
-                position_state.get(f'sl{i}') for i in range(1, 6)
-                if position_state.get(f'sl{i}')
-            ],
-            "tp_levels": [
-                position_state.get(f'tp{i}') for i in range(1, 6)
-                if position_state.get(f'tp{i}')
-            ]
+            "current_price": price,
+            "sl_levels": [v for k in _SL_KEYS if (v := get(k))],
+            "tp_levels": [v for k in _TP_KEYS if (v := get(k))]
         },
         "position_info": {
-            "size": position_state.get('position_size', 0),
-            "pnl": position_state.get('pnl', 0),
-            "direction": "LONG" if position_state.get('position_size', 0) > 0 
-                        else "SHORT" if position_state.get('position_size', 0) < 0 
-                        else "FLAT"
+            "size": size,
+            "pnl": get('pnl', 0),
+            "direction": "LONG" if size > 0 else "SHORT" if size < 0 else "FLAT"
         },
         "risk_metrics": {
-            "risk_to_sl1": None,
-            "reward_to_tp1": None,
-            "risk_reward_ratio": None
+            "risk_to_sl1": risk,
+            "reward_to_tp1": reward,
+            "risk_reward_ratio": round(reward / risk, 2) if risk and reward else None
         }
     }
-    
-    # Calculate risk metrics
-    price = position_state.get('price')
-    sl1 = position_state.get('sl1')
-    tp1 = position_state.get('tp1')
-    
-    if price and sl1:
-        indicators["risk_metrics"]["risk_to_sl1"] = abs(price - sl1)
-    if price and tp1:
-        indicators["risk_metrics"]["reward_to_tp1"] = abs(tp1 - price)
-    if indicators["risk_metrics"]["risk_to_sl1"] and indicators["risk_metrics"]["reward_to_tp1"]:
-        risk = indicators["risk_metrics"]["risk_to_sl1"]
-        if risk > 0:
-            indicators["risk_metrics"]["risk_reward_ratio"] = round(
-                indicators["risk_metrics"]["reward_to_tp1"] / risk, 2
-            )
-    
-    return indicators
 
 
 # =============================================================================
 # STREAMLIT UI
 # =============================================================================
 
+# Decision code -> label / display colour, shared by every result block
+_DECISION_LABELS = {1: 'SELL', 2: 'HOLD', 3: 'BUY'}
+_DECISION_COLORS = {1: 'red', 2: 'gray', 3: 'green'}
+_DECISION_HEX = {1: '#F87171', 2: '#8A9BB0', 3: '#4ADE80'}
+
 def main():
     st.title("MT5 Meta Agent V11 - Vision System")
     
@@ -649,21 +962,20 @@ def main():
         st.subheader("Screenshot Settings")
         monitor = st.number_input("Monitor", min_value=1, max_value=4, value=1)
         
-        use_region = st.checkbox("Custom Region")
-        if use_region:
-            col1, col2 = st.columns(2)
-            with col1:
-                region_left = st.number_input("Left", value=0)
-                region_top = st.number_input("Top", value=0)
-            with col2:
-                region_width = st.number_input("Width", value=1920)
-                region_height = st.number_input("Height", value=1080)
-            region = {
-                "left": region_left, "top": region_top,
-                "width": region_width, "height": region_height
-            }
-        else:
-            region = None
+        # Chart region - always a sub-rectangle. Keyed inputs keep the
+        # profile in session_state across reruns; CHART_REGION seeds it.
+        st.caption("Chart Region")
+        col1, col2 = st.columns(2)
+        with col1:
+            region_left = st.number_input("Left", value=DEFAULT_CHART_REGION['left'], min_value=0, key='region_left')
+            region_top = st.number_input("Top", value=DEFAULT_CHART_REGION['top'], min_value=0, key='region_top')
+        with col2:
+            region_width = st.number_input("Width", value=DEFAULT_CHART_REGION['width'], min_value=1, key='region_width')
+            region_height = st.number_input("Height", value=DEFAULT_CHART_REGION['height'], min_value=1, key='region_height')
+        region = {
+            "left": region_left, "top": region_top,
+            "width": region_width, "height": region_height
+        }
         
         st.subheader("Vision API")
         enable_vision = st.checkbox("Enable Vision Analysis", value=True)
@@ -676,7 +988,7 @@ def main():
         st.header("Position State")
         
         # Fetch latest position state
-        position_state = get_latest_position_state(symbol, timeframe)
+        position_state, m15_context = get_contexts(symbol, timeframe)
         
         if position_state:
             # Display metrics
@@ -705,7 +1017,6 @@ def main():
                     st.metric(f"TP{i+1}", f"{tp_val:.2f}" if tp_val else "-")
             
             # M15 context
-            m15_context = get_m15_context(symbol)
             if m15_context:
                 st.subheader("M15 Context")
                 m15_cols = st.columns(3)
@@ -723,8 +1034,15 @@ def main():
     with col2:
         st.header("Vision Analysis")
         
-        # Screenshot capture button
-        if st.button("Capture & Analyze", type="primary"):
+        # Screenshot capture button - a form submit is True on exactly one
+        # rerun per click, so other widgets rerunning the page can never
+        # repeat the capture + Vision call
+        st.session_state.setdefault('cycle_id', 0)
+        with st.form('capture_form'):
+            submitted = st.form_submit_button("Capture & Analyze", type="primary")
+        
+        if submitted:
+            st.session_state['cycle_id'] += 1
             with st.spinner("Capturing screenshot..."):
                 try:
                     img, img_base64 = capture_chart_screenshot(monitor, region)
@@ -739,53 +1057,55 @@ def main():
                     img_base64 = None
             
             if enable_vision and img_base64:
-                with st.spinner("Analyzing with Claude Vision..."):
-                    result = analyze_chart_with_vision(
+                # Vision call runs on the I/O pool. The future is kept in
+                # session_state and polled by collect_vision_job's fragment,
+                # so the page stays live and no second request is fired.
+                st.session_state['vision_job'] = (
+                    st.session_state['cycle_id'],
+                    position_state,
+                    get_io_pool().submit(
+                        analyze_chart_with_vision,
                         img_base64,
                         position_state,
                         m15_context,
-                        custom_prompt if custom_prompt else None
+                        custom_prompt if custom_prompt else None,
+                        get_anthropic_client()
                     )
-                    
-                    st.session_state['last_analysis'] = result
-                    
-                    # Display result
-                    decision = result.get('decision', 2)
-                    decision_label = {1: 'SELL', 2: 'HOLD', 3: 'BUY'}.get(decision, 'HOLD')
-                    decision_color = {1: 'red', 2: 'gray', 3: 'green'}.get(decision, 'gray')
-                    
-                    st.markdown(f"### Decision: <span style='color:{decision_color}'>{decision_label}</span>", 
-                               unsafe_allow_html=True)
-                    
-                    st.metric("Confidence", f"{result.get('confidence', 0):.0%}")
-                    st.write("**Analysis:**", result.get('analysis', 'N/A'))
-                    
-                    if result.get('suggested_sl'):
-                        st.metric("Suggested SL", f"{result.get('suggested_sl'):.2f}")
-                    if result.get('suggested_tp'):
-                        st.metric("Suggested TP", f"{result.get('suggested_tp'):.2f}")
-                    
-                    # Store to database
-                    if position_state.get('id'):
-                        from id_gen_api import IDGenerator
-                        id_gen = IDGenerator.get_instance(DB_PATH)
-                        analysis_id = id_gen.generate_analysis_id('V')
-                        
-                        insert_ai_analysis(
-                            analysis_id=analysis_id,
-                            position_state_id=position_state['id'],
-                            analysis_type='VISION',
-                            analysis_result=json.dumps(result),
-                            confidence=result.get('confidence', 0)
-                        )
-                        st.success(f"Analysis stored: {analysis_id}")
-        
-        # Show last analysis if exists
-        if 'last_analysis' in st.session_state and not st.button("Clear"):
-            st.subheader("Last Analysis")
+                )
+        
+        # Still running - only the fragment polls; the page stays usable
+        run_job_fragment('vision_job', collect_vision_job, not submitted)
+        
+        if 'vision_result' in st.session_state:
+            result, analysis_id = st.session_state.pop('vision_result')
+            
+            # Display result
+            decision = result.get('decision', 2)
+            decision_label = _DECISION_LABELS.get(decision, 'HOLD')
+            decision_color = _DECISION_COLORS.get(decision, 'gray')
+            
+            st.markdown(f"### Decision: <span style='color:{decision_color}'>{decision_label}</span>", 
+                       unsafe_allow_html=True)
+            
+            st.metric("Confidence", f"{result.get('confidence', 0):.0%}")
+            st.write("**Analysis:**", result.get('analysis', 'N/A'))
+            
+            if result.get('suggested_sl'):
+                st.metric("Suggested SL", f"{result.get('suggested_sl'):.2f}")
+            if result.get('suggested_tp'):
+                st.metric("Suggested TP", f"{result.get('suggested_tp'):.2f}")
+            
+            if analysis_id:
+                st.success(f"Analysis stored: {analysis_id}")
+        
+        # Show last analysis if exists. Clear drops it in a callback, which
+        # runs before the rerun, instead of a second button check per rerun.
+        if 'last_analysis' in st.session_state:
+            st.subheader(f"Last Analysis (cycle {st.session_state.get('last_analysis_cycle', 0)})")
             result = st.session_state['last_analysis']
             with st.expander("Raw Response"):
                 st.code(result.get('raw_response', ''))
+            st.button("Clear", on_click=lambda: st.session_state.pop('last_analysis', None))
     
     # Indicator section
     st.header("Indicators")
@@ -813,7 +1133,7 @@ def main():
                 output_id = insert_streamlit_output(
                     position_state_id=position_state['id'],
                     indicator_group='FULL',
-                    indicator_values=json.dumps(indicators)
+                    indicator_values=dumps_json(indicators)
                 )
                 st.success(f"Indicators saved! Output ID: {output_id}")
     
@@ -830,61 +1150,68 @@ def main():
         include_vision = st.checkbox("Include Vision Data", value=True)
         
         if st.button("Run API Complex", type="primary"):
-            with st.spinner("Running API complex..."):
-                try:
-                    payload = {
-                        "complex_id": complex_id,
-                        "master_id": master_id,
-                        "symbol": symbol,
-                        "timeframe": timeframe
-                    }
-                    
-                    if include_vision and 'last_screenshot_base64' in st.session_state:
-                        payload['vision_data'] = st.session_state['last_screenshot_base64']
-                    
-                    response = requests.post(
-                        f"{FLASK_API_URL}/run_complex",
-                        json=payload,
-                        timeout=60
-                    )
-                    
-                    if response.ok:
-                        result = response.json()['data']
-                        
-                        st.success(f"Complex run complete! Run ID: {result['run_id']}")
-                        
-                        # Display decisions
-                        st.subheader("API Decisions")
-                        decision_cols = st.columns(4)
-                        for i, api_dec in enumerate(result['api_decisions']):
-                            with decision_cols[i]:
-                                dec_val = api_dec['decision']
-                                dec_label = {1: 'SELL', 2: 'HOLD', 3: 'BUY'}.get(dec_val, '?')
-                                dec_color = {1: '#F87171', 2: '#8A9BB0', 3: '#4ADE80'}.get(dec_val, 'gray')
-                                st.markdown(f"<h2 style='color:{dec_color};text-align:center'>{dec_val}</h2>", 
-                                           unsafe_allow_html=True)
-                                st.caption(api_dec['profile_id'][-12:])
-                        
-                        # Consensus
-                        st.subheader("Consensus")
-                        cons = result['consensus']
-                        st.write(f"SELL: {cons['sell_count']} | HOLD: {cons['hold_count']} | BUY: {cons['buy_count']}")
-                        st.metric("Consensus %", f"{cons['consensus_pct']:.0%}")
-                        
-                        # Final decision
-                        final = result['final_decision']
-                        final_label = {1: 'SELL', 2: 'HOLD', 3: 'BUY'}.get(final, '?')
-                        final_color = {1: '#F87171', 2: '#8A9BB0', 3: '#4ADE80'}.get(final, 'gray')
-                        st.markdown(f"### Final: <span style='color:{final_color}'>{final_label}</span>", 
-                                   unsafe_allow_html=True)
-                        
-                        if result['webhook_written']:
-                            st.success("Webhook signal written!")
-                    else:
-                        st.error(f"API error: {response.text}")
-                        
-                except requests.exceptions.RequestException as e:
-                    st.error(f"Request failed: {e}")
+            payload = {
+                "complex_id": complex_id,
+                "master_id": master_id,
+                "symbol": symbol,
+                "timeframe": timeframe
+            }
+            
+            if include_vision and 'last_screenshot_base64' in st.session_state:
+                payload['vision_data'] = st.session_state['last_screenshot_base64']
+            
+            # POST on the I/O pool, future kept in session_state and polled
+            # by collect_complex_job's fragment, so it can overlap an
+            # in-flight Vision call
+            st.session_state['complex_job'] = get_io_pool().submit(
+                get_http_session().post,
+                f"{FLASK_API_URL}/run_complex",
+                json=payload,
+                timeout=60
+            )
+        
+        run_job_fragment('complex_job', collect_complex_job)
+        
+        if 'complex_result' in st.session_state:
+            error, response = st.session_state.pop('complex_result')
+            
+            if error is not None:
+                st.error(f"Request failed: {error}")
+            else:
+                if response.ok:
+                    result = response.json()['data']
+                
+                    st.success(f"Complex run complete! Run ID: {result['run_id']}")
+                
+                    # Display decisions
+                    st.subheader("API Decisions")
+                    decision_cols = st.columns(4)
+                    for i, api_dec in enumerate(result['api_decisions']):
+                        with decision_cols[i]:
+                            dec_val = api_dec['decision']
+                            dec_label = _DECISION_LABELS.get(dec_val, '?')
+                            dec_color = _DECISION_HEX.get(dec_val, 'gray')
+                            st.markdown(f"<h2 style='color:{dec_color};text-align:center'>{dec_val}</h2>", 
+                                       unsafe_allow_html=True)
+                            st.caption(api_dec['profile_id'][-12:])
+                
+                    # Consensus
+                    st.subheader("Consensus")
+                    cons = result['consensus']
+                    st.write(f"SELL: {cons['sell_count']} | HOLD: {cons['hold_count']} | BUY: {cons['buy_count']}")
+                    st.metric("Consensus %", f"{cons['consensus_pct']:.0%}")
+                
+                    # Final decision
+                    final = result['final_decision']
+                    final_label = _DECISION_LABELS.get(final, '?')
+                    final_color = _DECISION_HEX.get(final, 'gray')
+                    st.markdown(f"### Final: <span style='color:{final_color}'>{final_label}</span>", 
+                               unsafe_allow_html=True)
+                
+                    if result['webhook_written']:
+                        st.success("Webhook signal written!")
+                else:
+                    st.error(f"API error: {response.text}")
     
     # Footer
     st.markdown("---")
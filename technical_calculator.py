@@ -20,10 +20,28 @@ Usage:
 import os
 import sys
 import math
+import atexit
 import sqlite3
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from datetime import datetime, timezone
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, NamedTuple, Iterable
+
+# The numeric cores of the four scorers compile to native code when numba
+# is installed; without it the same functions run as plain Python/NumPy.
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Pass-through stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
@@ -37,87 +55,274 @@ logger = logging.getLogger(__name__)
 # NORMALIZATION UTILITIES
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _tanh(x: float, scale: float = 1.0) -> float:
-    """Smooth normalization to [-1, +1]. Scale controls sensitivity."""
-    return math.tanh(x * scale)
-
-
+@njit(cache=True)
 def _clamp(x: float, lo: float = -1.0, hi: float = 1.0) -> float:
-    return max(lo, min(hi, x))
+    """max(lo, min(hi, x)) as plain branches - no builtin calls.
+    Same result for every input, NaN included (NaN clamps to hi)."""
+    x = x if x < hi else hi
+    return x if x > lo else lo
 
 
-def _safe(val, default=0.0) -> float:
-    """Safely convert DB value to float."""
-    if val is None:
-        return default
+def _to_float(val) -> Optional[float]:
+    """DB value -> float, or None for NULL / non-numeric. Used once per
+    column at load time (see _coerce_row)."""
+    if val is None or type(val) is float:
+        return val
     try:
         return float(val)
     except (ValueError, TypeError):
-        return default
+        return None
 
 
+def _num(val, default=0.0) -> float:
+    """Coerced column value, or default when it was NULL / non-numeric."""
+    return default if val is None else val
+
 # ═══════════════════════════════════════════════════════════════════════════
 # DATA LOADER
 # ═══════════════════════════════════════════════════════════════════════════
 
+# One read-only connection per intelligence DB, opened on first use and kept
+# for the life of the process. Scores are requested per symbol per tick, so
+# reopening meant re-opening the DB/WAL/SHM files and a cold page cache
+# every call.
+_CONN_CACHE: Dict[str, sqlite3.Connection] = {}
+_CONN_LOCK = threading.Lock()
+# Per-DB lock serialising reads on the shared connection (it holds one
+# transaction at a time)
+_READ_LOCKS: Dict[str, threading.Lock] = {}
+_MMAP_SIZE = 64 * 1024 * 1024
+
+
+# Tables read newest-first by timestamp
+_TS_TABLES = ('core_15m', 'advanced_indicators', 'basic_15m', 'fibonacci_data', 'ath_tracking')
+
+
+def _ensure_ts_indexes(conn: sqlite3.Connection):
+    """
+    Give every _TS_TABLES table an index led by timestamp, so the
+    ORDER BY timestamp DESC LIMIT n reads are index seeks, not scans+sorts.
+    Tables that already have one (the UNIQUE(timestamp, ...) autoindex the
+    init scripts create counts) are left alone. Best effort: a read-only
+    file, a busy writer or a missing table just skips it.
+    """
+    for table in _TS_TABLES:
+        try:
+            has_ts_index = False
+            for idx in conn.execute(f"PRAGMA index_list({table})").fetchall():
+                cols = conn.execute(f"PRAGMA index_info('{idx[1]}')").fetchall()
+                if any(seqno == 0 and name == 'timestamp' for seqno, _, name in cols):
+                    has_ts_index = True
+                    break
+            if not has_ts_index:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_ts ON {table}(timestamp DESC)")
+        except sqlite3.DatabaseError:
+            pass
+
+
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    """Return the cached read-only connection for db_path, opening it once."""
+    conn = _CONN_CACHE.get(db_path)
+    if conn is not None:
+        return conn
+
+    with _CONN_LOCK:
+        conn = _CONN_CACHE.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:
+                pass  # a writer holds the DB; keep its journal mode
+            _ensure_ts_indexes(conn)
+            conn.execute("PRAGMA query_only=1")
+            conn.execute("PRAGMA cache_size=-20000")
+            # Read pages through a memory map instead of a read() syscall
+            # per page; SQLite maps at most this much (64 MB) of the file
+            # and falls back to normal I/O where mmap is unavailable.
+            try:
+                conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+                conn.execute("PRAGMA temp_store=MEMORY")
+            except sqlite3.DatabaseError:
+                pass
+            _READ_LOCKS[db_path] = threading.Lock()
+            _CONN_CACHE[db_path] = conn
+    return conn
+
+
+@atexit.register
+def _close_cached_conns():
+    with _CONN_LOCK:
+        for conn in _CONN_CACHE.values():
+            conn.close()
+        _CONN_CACHE.clear()
+
+
+# Fixed SQL text so each cached connection keeps these statements prepared
+_CANDLES_SQL = "SELECT * FROM core_15m ORDER BY timestamp DESC LIMIT ?"
+
+_LATEST_ROW_SQL = {
+    'indicators': "SELECT * FROM advanced_indicators ORDER BY timestamp DESC LIMIT 1",
+    'basic': "SELECT * FROM basic_15m ORDER BY timestamp DESC LIMIT 1",
+    'fib': "SELECT * FROM fibonacci_data ORDER BY timestamp DESC LIMIT 1",
+    'ath': "SELECT * FROM ath_tracking ORDER BY timestamp DESC LIMIT 1",
+}
+
+
+# Numeric columns the scorers read from each single-row table. They are
+# coerced to float (None when NULL or unparseable) once per load, so the
+# scorers take them as-is instead of converting on every use.
+_NUMERIC_COLS = {
+    'indicators': (
+        'rsi_14', 'macd_histogram_12_26', 'macd_line_12_26', 'macd_signal_12_26',
+        'bb_pct_20', 'bb_width_20', 'stoch_k_14', 'stoch_d_14', 'adx_14',
+        'cci_14', 'williams_r_14', 'ichimoku_tenkan', 'ichimoku_kijun',
+        'ichimoku_senkou_a', 'ichimoku_senkou_b', 'volume_ratio',
+    ),
+    'basic': ('ema_short', 'ema_medium', 'ema_distance', 'atr_14', 'atr_ratio'),
+    'fib': ('in_golden_zone',),
+    'ath': (),
+}
+
+
+def _coerce_row(row: dict, numeric: tuple) -> dict:
+    """Coerce the listed numeric columns of a row dict in place."""
+    for col in numeric:
+        if col in row:
+            row[col] = _to_float(row[col])
+    return row
+
+
+# supertrend / sar_trend text -> kernel flag. The common spellings hit the
+# dict directly; anything else falls back to an upper-cased lookup.
+_TREND_FLAG = {'UP': 1.0, 'DOWN': -1.0, 'up': 1.0, 'down': -1.0}
+
+
+def _trend_flag(val) -> float:
+    """1.0 for UP, -1.0 for DOWN, 0.0 for anything else (NULL included)."""
+    flag = _TREND_FLAG.get(val)
+    if flag is None:
+        flag = _TREND_FLAG.get(val.upper(), 0.0) if val else 0.0
+    return flag
+
+
+def _cols(cur) -> Dict[str, int]:
+    """Column name -> tuple index for a cursor's result set."""
+    return {d[0]: i for i, d in enumerate(cur.description)}
+
+
+# Column order of the candle array handed to the scorers
+OHLC_COLUMNS = ('open', 'high', 'low', 'close')
+C_OPEN, C_HIGH, C_LOW, C_CLOSE = range(4)
+
+
+def _candle_array(candles: list, cols: Dict[str, int]) -> np.ndarray:
+    """
+    Pack candle rows into an (N, 4) float64 [open, high, low, close] array,
+    newest first. NULLs, non-numeric cells and missing columns become 0.0,
+    matching _num(_to_float()).
+    """
+    idx = [cols.get(name) for name in OHLC_COLUMNS]
+    try:
+        arr = np.array([[c[i] for i in idx] for c in candles], dtype=np.float64)
+    except (ValueError, TypeError):
+        # A text cell or a missing column - coerce cell by cell instead
+        arr = np.array([[0.0 if i is None else _num(_to_float(c[i])) for i in idx]
+                        for c in candles], dtype=np.float64).reshape(-1, len(OHLC_COLUMNS))
+    arr[np.isnan(arr)] = 0.0
+    return arr
+
+
+# fromisoformat() takes a trailing 'Z' from 3.11 on
+_PY311 = sys.version_info >= (3, 11)
+
+
+def _age_seconds(latest_ts) -> float:
+    """Seconds since an ISO timestamp (naive = UTC); 9999 if unparseable."""
+    if not latest_ts:
+        return 9999
+    try:
+        if _PY311:
+            dt = datetime.fromisoformat(latest_ts)
+        elif latest_ts.endswith('Z'):
+            dt = datetime.fromisoformat(latest_ts[:-1]).replace(tzinfo=timezone.utc)
+        else:
+            dt = datetime.fromisoformat(latest_ts)
+    except (ValueError, TypeError, AttributeError):
+        return 9999
+    now = datetime.now(timezone.utc)
+    return (now - (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc))).total_seconds()
+
+
+# Newest timestamp of every table the scores read from. Bars close every
+# 900 s, so between closes this one cheap query is all a call costs.
+_DATA_MARKER_SQL = (
+    "SELECT (SELECT MAX(timestamp) FROM core_15m),"
+    " (SELECT MAX(timestamp) FROM advanced_indicators),"
+    " (SELECT MAX(timestamp) FROM basic_15m),"
+    " (SELECT MAX(timestamp) FROM fibonacci_data)"
+)
+
+
+def _data_marker(db_path: str) -> Optional[tuple]:
+    """Latest-timestamp tuple for db_path, or None if it can't be read."""
+    if not os.path.exists(db_path):
+        return None
+    conn = _get_conn(db_path)
+    try:
+        with _READ_LOCKS[db_path]:
+            return conn.execute(_DATA_MARKER_SQL).fetchone()
+    except sqlite3.Error:
+        return None
+
+
 def _load_latest(db_path: str, n_candles: int = 5) -> Optional[Dict]:
     """
     Load the latest N candles + indicators from the intelligence DB.
-    Returns dict with 'candles', 'indicators', 'basic', 'fib', 'ath' keys.
+    Returns dict with 'candles' (an (N, 4) OHLC array, see _candle_array),
+    'indicators', 'basic', 'fib', 'ath' keys.
     """
     if not os.path.exists(db_path):
         logger.warning(f"Intelligence DB not found: {db_path}")
         return None
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = _get_conn(db_path)
 
     try:
-        cur = conn.execute(
-            "SELECT * FROM core_15m ORDER BY timestamp DESC LIMIT ?",
-            (n_candles,)
-        )
-        candles = [dict(r) for r in cur.fetchall()]
-
-        cur = conn.execute(
-            "SELECT * FROM advanced_indicators ORDER BY timestamp DESC LIMIT 1"
-        )
-        row = cur.fetchone()
-        indicators = dict(row) if row else {}
-
-        cur = conn.execute(
-            "SELECT * FROM basic_15m ORDER BY timestamp DESC LIMIT 1"
-        )
-        row = cur.fetchone()
-        basic = dict(row) if row else {}
-
-        cur = conn.execute(
-            "SELECT * FROM fibonacci_data ORDER BY timestamp DESC LIMIT 1"
-        )
-        row = cur.fetchone()
-        fib = dict(row) if row else {}
-
-        cur = conn.execute(
-            "SELECT * FROM ath_tracking ORDER BY timestamp DESC LIMIT 1"
-        )
-        row = cur.fetchone()
-        ath = dict(row) if row else {}
+        # One read transaction for all five lookups: a single shared lock /
+        # WAL snapshot instead of one per statement, and every table is read
+        # at the same point in time.
+        with _READ_LOCKS[db_path]:
+            conn.execute("BEGIN")
+            try:
+                cur = conn.execute(_CANDLES_SQL, (n_candles,))
+                candles = cur.fetchall()
+                candle_cols = _cols(cur)
+
+                latest = {}
+                for key, sql in _LATEST_ROW_SQL.items():
+                    cur = conn.execute(sql)
+                    row = cur.fetchone()
+                    latest[key] = (_coerce_row(dict(zip(_cols(cur), row)), _NUMERIC_COLS[key])
+                                   if row else {})
+            finally:
+                conn.execute("COMMIT")
+
+        indicators = latest['indicators']
+        basic = latest['basic']
+        fib = latest['fib']
+        ath = latest['ath']
 
         if not candles or not indicators:
             logger.warning("Intelligence DB has no data")
             return None
 
-        latest_ts = candles[0].get('timestamp', '')
-        try:
-            dt = datetime.fromisoformat(latest_ts.replace('Z', '+00:00'))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            age = (datetime.now(timezone.utc) - dt).total_seconds()
-        except (ValueError, TypeError):
-            age = 9999
+        ts_idx = candle_cols.get('timestamp')
+        latest_ts = candles[0][ts_idx] if ts_idx is not None else ''
+        age = _age_seconds(latest_ts)
 
         return {
-            'candles': candles,
+            'candles': _candle_array(candles, candle_cols),
             'indicators': indicators,
             'basic': basic,
             'fib': fib,
@@ -129,60 +334,114 @@ def _load_latest(db_path: str, n_candles: int = 5) -> Optional[Dict]:
     except Exception as e:
         logger.error(f"Failed to load intelligence data: {e}")
         return None
-    finally:
-        conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FEATURE EXTRACTION
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _Features(NamedTuple):
+    """Every indicator input the four scorers use, read once per score with
+    its scorer default applied."""
+    rsi_14: float
+    macd_hist: float
+    atr_14: float
+    stoch_k: float
+    stoch_d: float
+    cci: float
+    adx: float
+    bb_pct: float
+    ichimoku_tenkan: float
+    ichimoku_kijun: float
+    senkou_a: float
+    senkou_b: float
+    ema_short: float
+    ema_medium: float
+    ema_distance: float
+    supertrend: str
+    st_flag: float
+    sar_trend: str
+    sar_flag: float
+    fib_zone_num: int
+    in_golden: int
+
+
+def _extract_features(indicators: dict, basic: dict, fib: dict) -> _Features:
+    """Pull the scorer inputs out of the latest indicator rows."""
+    ind = indicators.get
+    bas = basic.get
+
+    fib_zone = fib.get('current_fib_zone', '5')
+    try:
+        fib_zone_num = int(fib_zone)
+    except (ValueError, TypeError):
+        fib_zone_num = 5
+
+    supertrend = bas('supertrend') or ''
+    sar_trend = ind('sar_trend') or ''
+
+    return _Features(
+        rsi_14=float(_num(ind('rsi_14'), 50.0)),
+        macd_hist=_num(ind('macd_histogram_12_26')),
+        atr_14=float(_num(bas('atr_14'), 1.0) or 1.0),
+        stoch_k=float(_num(ind('stoch_k_14'), 50.0)),
+        stoch_d=float(_num(ind('stoch_d_14'), 50.0)),
+        cci=_num(ind('cci_14')),
+        adx=float(_num(ind('adx_14'), 20.0)),
+        bb_pct=float(_num(ind('bb_pct_20'), 0.5)),
+        ichimoku_tenkan=_num(ind('ichimoku_tenkan')),
+        ichimoku_kijun=_num(ind('ichimoku_kijun')),
+        senkou_a=_num(ind('ichimoku_senkou_a')),
+        senkou_b=_num(ind('ichimoku_senkou_b')),
+        ema_short=_num(bas('ema_short')),
+        ema_medium=_num(bas('ema_medium')),
+        ema_distance=_num(bas('ema_distance')),
+        supertrend=supertrend,
+        st_flag=_trend_flag(supertrend),
+        sar_trend=sar_trend,
+        sar_flag=_trend_flag(sar_trend),
+        fib_zone_num=fib_zone_num,
+        in_golden=int(_num(fib.get('in_golden_zone'), 0)),
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # LAYER 1 SCORE: PRICE ACTION
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _score_price_action(candles: list, basic: dict) -> Dict:
-    """
-    Deterministic Price Action score from candle data + EMA position.
-    Components: candle direction, body dominance, EMA position, supertrend.
-    """
-    components = {}
+# Each scorer returns {'score', 'components', 'note'}. 'score' is rounded to
+# 4 places; components are left at full precision and only rounded where
+# they are displayed (the CLI prints them with :+.3f).
 
-    # 1. Candle direction: count bullish/bearish in last 3
-    directions = []
-    for c in candles[:3]:
-        o, cl = _safe(c.get('open')), _safe(c.get('close'))
-        if cl > o:
-            directions.append(1)
-        elif cl < o:
-            directions.append(-1)
-        else:
-            directions.append(0)
+@njit(cache=True)
+def _pa_kernel(candles, ema_dist, st_flag):
+    """Numeric core of the PA score. Returns
+    (score, candle_score, body_with_direction, ema_score, st_score,
+     avg_body, bullish_count)."""
+    th = math.tanh
+    recent = candles[:3]
+    opens, closes = recent[:, C_OPEN], recent[:, C_CLOSE]
 
-    bullish_count = sum(1 for d in directions if d > 0)
-    bearish_count = sum(1 for d in directions if d < 0)
-    candle_score = (bullish_count - bearish_count) / max(len(directions), 1)
-    components['candle_direction'] = round(candle_score, 3)
+    # 1. Candle direction: count bullish/bearish in last 3
+    bullish_count = np.count_nonzero(closes > opens)
+    bearish_count = np.count_nonzero(closes < opens)
+    candle_score = (bullish_count - bearish_count) / max(len(closes), 1)
 
     # 2. Body dominance: avg body % of total range
-    body_pcts = []
-    for c in candles[:3]:
-        o, h, l, cl = _safe(c.get('open')), _safe(c.get('high')), _safe(c.get('low')), _safe(c.get('close'))
-        total_range = h - l
-        if total_range > 0:
-            body_pct = abs(cl - o) / total_range
-            body_pcts.append(body_pct)
-
-    avg_body = sum(body_pcts) / max(len(body_pcts), 1) if body_pcts else 0.5
-    body_conviction = _tanh((avg_body - 0.4) * 3.0)
+    total_range = recent[:, C_HIGH] - recent[:, C_LOW]
+    has_range = total_range > 0
+    if has_range.any():
+        avg_body = (np.abs(closes - opens)[has_range] / total_range[has_range]).mean()
+    else:
+        avg_body = 0.5
+    body_conviction = th((avg_body - 0.4) * 3.0)
     body_with_direction = body_conviction * candle_score
-    components['body_conviction'] = round(body_with_direction, 3)
 
     # 3. EMA position
-    ema_dist = _safe(basic.get('ema_distance'))
-    ema_score = _tanh(ema_dist, 8.0)
-    components['ema_position'] = round(ema_score, 3)
+    ema_score = th(ema_dist * 8.0)
 
-    # 4. Supertrend
-    st = basic.get('supertrend', '').upper()
-    st_score = 0.3 if st == 'UP' else (-0.3 if st == 'DOWN' else 0.0)
-    components['supertrend'] = round(st_score, 3)
+    # 4. Supertrend (st_flag: UP=1, DOWN=-1, else 0)
+    st_score = 0.3 * st_flag
 
     # Weighted blend
     score = (
@@ -191,13 +450,35 @@ def _score_price_action(candles: list, basic: dict) -> Dict:
         ema_score * 0.25 +
         st_score * 0.20
     )
-    score = _clamp(score)
+    return (_clamp(score), candle_score, body_with_direction, ema_score,
+            st_score, avg_body, bullish_count)
 
-    direction_word = "bullish" if score > 0.15 else ("bearish" if score < -0.15 else "neutral")
-    note = (f"{direction_word.capitalize()} PA: {bullish_count}/3 green candles, "
-            f"body conviction {avg_body:.0%}, "
-            f"EMA dist {ema_dist:+.3f}%, "
-            f"supertrend {st or 'N/A'}")
+
+def _score_price_action(candles: np.ndarray, f: _Features) -> Dict:
+    """
+    Deterministic Price Action score from candle data + EMA position.
+    Components: candle direction, body dominance, EMA position, supertrend.
+    """
+    ema_dist = f.ema_distance
+
+    (score, candle_score, body_with_direction, ema_score, st_score,
+     avg_body, bullish_count) = _pa_kernel(candles, ema_dist, f.st_flag)
+    # Plain Python scalars out (the no-numba path yields NumPy ones)
+    score, candle_score, body_with_direction, avg_body = (
+        float(score), float(candle_score), float(body_with_direction), float(avg_body))
+    bullish_count = int(bullish_count)
+
+    components = {
+        'candle_direction': candle_score,
+        'body_conviction': body_with_direction,
+        'ema_position': ema_score,
+        'supertrend': st_score,
+    }
+
+    direction_word = "Bullish" if score > 0.15 else ("Bearish" if score < -0.15 else "Neutral")
+    note = ("{} PA: {}/3 green candles, body conviction {:.0%}, "
+            "EMA dist {:+.3f}%, supertrend {}"
+            .format(direction_word, bullish_count, avg_body, ema_dist, f.supertrend.upper() or 'N/A'))
 
     return {'score': round(score, 4), 'components': components, 'note': note}
 
@@ -206,52 +487,33 @@ def _score_price_action(candles: list, basic: dict) -> Dict:
 # LAYER 1 SCORE: KEY LEVELS
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _score_key_levels(indicators: dict, basic: dict, fib: dict) -> Dict:
-    """
-    Deterministic Key Levels score from structural position indicators.
-    Components: Bollinger %B, Fibonacci zone, SAR, Ichimoku cloud.
-    """
-    components = {}
-
+@njit(cache=True)
+def _kl_kernel(bb_pct, fib_zone_num, in_golden, sar_flag, senkou_a, senkou_b, price):
+    """Numeric core of the KL score. Returns
+    (score, bb_score, fib_score, sar_score, ichi_score)."""
+    th = math.tanh
     # 1. Bollinger %B
-    bb_pct = _safe(indicators.get('bb_pct_20'), 0.5)
-    bb_score = _tanh((0.5 - bb_pct) * 2.0)
-    components['bollinger_pct'] = round(bb_score, 3)
+    bb_score = th((0.5 - bb_pct) * 2.0)
 
     # 2. Fibonacci zone
-    in_golden = int(_safe(fib.get('in_golden_zone'), 0))
-    fib_zone = fib.get('current_fib_zone', '5')
-    try:
-        fib_zone_num = int(fib_zone)
-    except (ValueError, TypeError):
-        fib_zone_num = 5
-    fib_score = _tanh((5 - fib_zone_num) * 0.15)
+    fib_score = th((5 - fib_zone_num) * 0.15)
     if in_golden:
         fib_score *= 1.3
     fib_score = _clamp(fib_score)
-    components['fib_zone'] = round(fib_score, 3)
 
-    # 3. SAR trend
-    sar_trend = indicators.get('sar_trend', '').upper()
-    sar_score = 0.25 if sar_trend == 'UP' else (-0.25 if sar_trend == 'DOWN' else 0.0)
-    components['sar'] = round(sar_score, 3)
+    # 3. SAR trend (sar_flag: UP=1, DOWN=-1, else 0)
+    sar_score = 0.25 * sar_flag
 
     # 4. Ichimoku cloud position
-    senkou_a = _safe(indicators.get('ichimoku_senkou_a'))
-    senkou_b = _safe(indicators.get('ichimoku_senkou_b'))
-    cloud_top = max(senkou_a, senkou_b) if senkou_a and senkou_b else 0
-    cloud_bottom = min(senkou_a, senkou_b) if senkou_a and senkou_b else 0
-    price = _safe(basic.get('ema_short'))
-    if price and cloud_top and cloud_bottom:
-        if price > cloud_top:
-            ichi_score = 0.3
-        elif price < cloud_bottom:
-            ichi_score = -0.3
-        else:
-            ichi_score = 0.0
-    else:
-        ichi_score = 0.0
-    components['ichimoku_cloud'] = round(ichi_score, 3)
+    ichi_score = 0.0
+    if senkou_a and senkou_b:
+        cloud_top = max(senkou_a, senkou_b)
+        cloud_bottom = min(senkou_a, senkou_b)
+        if price and cloud_top and cloud_bottom:
+            if price > cloud_top:
+                ichi_score = 0.3
+            elif price < cloud_bottom:
+                ichi_score = -0.3
 
     score = (
         bb_score * 0.30 +
@@ -259,12 +521,34 @@ def _score_key_levels(indicators: dict, basic: dict, fib: dict) -> Dict:
         sar_score * 0.20 +
         ichi_score * 0.25
     )
-    score = _clamp(score)
+    return _clamp(score), bb_score, fib_score, sar_score, ichi_score
+
+
+def _score_key_levels(f: _Features) -> Dict:
+    """
+    Deterministic Key Levels score from structural position indicators.
+    Components: Bollinger %B, Fibonacci zone, SAR, Ichimoku cloud.
+    """
+    bb_pct = f.bb_pct
+    in_golden = f.in_golden
+    fib_zone_num = f.fib_zone_num
+
+    score, bb_score, fib_score, sar_score, ichi_score = _kl_kernel(
+        bb_pct, float(fib_zone_num), float(in_golden), f.sar_flag,
+        f.senkou_a, f.senkou_b, f.ema_short,
+    )
+
+    components = {
+        'bollinger_pct': bb_score,
+        'fib_zone': fib_score,
+        'sar': sar_score,
+        'ichimoku_cloud': ichi_score,
+    }
 
-    note = (f"BB%B={bb_pct:.2f}, fib zone {fib_zone_num}"
-            f"{'(golden)' if in_golden else ''}, "
-            f"SAR {sar_trend or 'N/A'}, "
-            f"{'above' if ichi_score > 0 else 'below' if ichi_score < 0 else 'in'} Ichimoku cloud")
+    note = ("BB%B={:.2f}, fib zone {}{}, SAR {}, {} Ichimoku cloud"
+            .format(bb_pct, fib_zone_num, '(golden)' if in_golden else '',
+                    f.sar_trend.upper() or 'N/A',
+                    'above' if ichi_score > 0 else 'below' if ichi_score < 0 else 'in'))
 
     return {'score': round(score, 4), 'components': components, 'note': note}
 
@@ -273,15 +557,12 @@ def _score_key_levels(indicators: dict, basic: dict, fib: dict) -> Dict:
 # LAYER 1 SCORE: MOMENTUM
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _score_momentum(indicators: dict, basic: dict) -> Dict:
-    """
-    Deterministic Momentum score from oscillator indicators.
-    Components: RSI, MACD histogram, Stochastic cross, CCI, ADX direction.
-    """
-    components = {}
-
+@njit(cache=True)
+def _mom_kernel(rsi, macd_hist, atr, stoch_k, stoch_d, cci, adx):
+    """Numeric core of the MOM score. Returns
+    (score, rsi_score, macd_score, stoch_score, cci_score, adx_score)."""
+    th = math.tanh
     # 1. RSI(14)
-    rsi = _safe(indicators.get('rsi_14'), 50)
     rsi_trend = (rsi - 50) / 50
     if rsi > 70:
         rsi_score = rsi_trend * 0.7
@@ -290,33 +571,22 @@ def _score_momentum(indicators: dict, basic: dict) -> Dict:
     else:
         rsi_score = rsi_trend
     rsi_score = _clamp(rsi_score)
-    components['rsi_14'] = round(rsi_score, 3)
 
     # 2. MACD histogram normalized by ATR
-    macd_hist = _safe(indicators.get('macd_histogram_12_26'))
-    atr = _safe(basic.get('atr_14'), 1.0) or 1.0
     macd_normalized = macd_hist / atr
-    macd_score = _tanh(macd_normalized, 3.0)
-    components['macd_histogram'] = round(macd_score, 3)
+    macd_score = th(macd_normalized * 3.0)
 
     # 3. Stochastic K vs D
-    stoch_k = _safe(indicators.get('stoch_k_14'), 50)
-    stoch_d = _safe(indicators.get('stoch_d_14'), 50)
     stoch_diff = (stoch_k - stoch_d)
-    stoch_score = _tanh(stoch_diff * 0.04)
-    components['stochastic_cross'] = round(stoch_score, 3)
+    stoch_score = th(stoch_diff * 0.04)
 
     # 4. CCI(14)
-    cci = _safe(indicators.get('cci_14'))
-    cci_score = _tanh(cci / 150)
-    components['cci_14'] = round(cci_score, 3)
+    cci_score = th(cci / 150)
 
     # 5. ADX directional
-    adx = _safe(indicators.get('adx_14'), 20)
     trend_strength = min(adx / 40, 1.0)
     direction = 1.0 if macd_hist > 0 else (-1.0 if macd_hist < 0 else 0.0)
     adx_score = direction * trend_strength * 0.5
-    components['adx_direction'] = round(adx_score, 3)
 
     score = (
         rsi_score * 0.25 +
@@ -325,13 +595,33 @@ def _score_momentum(indicators: dict, basic: dict) -> Dict:
         cci_score * 0.15 +
         adx_score * 0.15
     )
-    score = _clamp(score)
+    return _clamp(score), rsi_score, macd_score, stoch_score, cci_score, adx_score
 
-    direction_word = "bullish" if score > 0.15 else ("bearish" if score < -0.15 else "flat")
-    note = (f"{direction_word.capitalize()} momentum: "
-            f"RSI={rsi:.1f}, MACD hist={macd_hist:+.3f}, "
-            f"Stoch K/D={stoch_k:.0f}/{stoch_d:.0f}, "
-            f"CCI={cci:+.0f}, ADX={adx:.0f}")
+
+def _score_momentum(f: _Features) -> Dict:
+    """
+    Deterministic Momentum score from oscillator indicators.
+    Components: RSI, MACD histogram, Stochastic cross, CCI, ADX direction.
+    """
+    rsi, macd_hist = f.rsi_14, f.macd_hist
+    stoch_k, stoch_d = f.stoch_k, f.stoch_d
+    cci, adx = f.cci, f.adx
+
+    score, rsi_score, macd_score, stoch_score, cci_score, adx_score = _mom_kernel(
+        rsi, macd_hist, f.atr_14, stoch_k, stoch_d, cci, adx)
+
+    components = {
+        'rsi_14': rsi_score,
+        'macd_histogram': macd_score,
+        'stochastic_cross': stoch_score,
+        'cci_14': cci_score,
+        'adx_direction': adx_score,
+    }
+
+    direction_word = "Bullish" if score > 0.15 else ("Bearish" if score < -0.15 else "Flat")
+    note = ("{} momentum: RSI={:.1f}, MACD hist={:+.3f}, "
+            "Stoch K/D={:.0f}/{:.0f}, CCI={:+.0f}, ADX={:.0f}"
+            .format(direction_word, rsi, macd_hist, stoch_k, stoch_d, cci, adx))
 
     return {'score': round(score, 4), 'components': components, 'note': note}
 
@@ -340,58 +630,49 @@ def _score_momentum(indicators: dict, basic: dict) -> Dict:
 # LAYER 1 SCORE: STRUCTURE
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _score_structure(indicators: dict, basic: dict, candles: list) -> Dict:
-    """
-    Deterministic Structure score from regime/trend indicators.
-    Components: ADX regime, Ichimoku TK cross, EMA alignment, price progression.
-    """
-    components = {}
-
+@njit(cache=True)
+def _str_kernel(adx, macd_hist, tenkan, kijun, ema_short, ema_medium, candles):
+    """Numeric core of the STR score. Returns
+    (score, adx_regime, tk_score, ema_score, progression_score)."""
+    th = math.tanh
     # 1. ADX regime
-    adx = _safe(indicators.get('adx_14'), 20)
-    macd_hist = _safe(indicators.get('macd_histogram_12_26'))
     if adx < 20:
         adx_regime = 0.0
     else:
         direction = 1.0 if macd_hist > 0 else -1.0
-        strength = _tanh((adx - 20) * 0.08)
+        strength = th((adx - 20) * 0.08)
         adx_regime = direction * strength
-    components['adx_regime'] = round(adx_regime, 3)
 
     # 2. Ichimoku TK cross
-    tenkan = _safe(indicators.get('ichimoku_tenkan'))
-    kijun = _safe(indicators.get('ichimoku_kijun'))
     if tenkan and kijun and kijun != 0:
         tk_diff = (tenkan - kijun) / kijun * 100
-        tk_score = _tanh(tk_diff, 2.0)
+        tk_score = th(tk_diff * 2.0)
     else:
         tk_score = 0.0
-    components['ichimoku_tk'] = round(tk_score, 3)
 
     # 3. EMA alignment
-    ema_short = _safe(basic.get('ema_short'))
-    ema_medium = _safe(basic.get('ema_medium'))
     if ema_short and ema_medium and ema_medium != 0:
         ema_alignment = (ema_short - ema_medium) / ema_medium * 100
-        ema_score = _tanh(ema_alignment, 3.0)
+        ema_score = th(ema_alignment * 3.0)
     else:
         ema_score = 0.0
-    components['ema_alignment'] = round(ema_score, 3)
 
     # 4. Price progression (HH/HL or LH/LL)
     if len(candles) >= 4:
-        highs = [_safe(c.get('high')) for c in candles[:4]][::-1]
-        lows = [_safe(c.get('low')) for c in candles[:4]][::-1]
-        higher_highs = sum(1 for i in range(1, len(highs)) if highs[i] > highs[i-1])
-        higher_lows = sum(1 for i in range(1, len(lows)) if lows[i] > lows[i-1])
-        lower_highs = sum(1 for i in range(1, len(highs)) if highs[i] < highs[i-1])
-        lower_lows = sum(1 for i in range(1, len(lows)) if lows[i] < lows[i-1])
+        # Oldest -> newest steps over the last 4 candles
+        highs = candles[3::-1, C_HIGH]
+        lows = candles[3::-1, C_LOW]
+        high_steps = highs[1:] - highs[:-1]
+        low_steps = lows[1:] - lows[:-1]
+        higher_highs = np.count_nonzero(high_steps > 0)
+        higher_lows = np.count_nonzero(low_steps > 0)
+        lower_highs = np.count_nonzero(high_steps < 0)
+        lower_lows = np.count_nonzero(low_steps < 0)
         bull_structure = (higher_highs + higher_lows) / 6
         bear_structure = (lower_highs + lower_lows) / 6
         progression_score = _clamp(bull_structure - bear_structure)
     else:
         progression_score = 0.0
-    components['price_progression'] = round(progression_score, 3)
 
     score = (
         adx_regime * 0.30 +
@@ -399,36 +680,168 @@ def _score_structure(indicators: dict, basic: dict, candles: list) -> Dict:
         ema_score * 0.25 +
         progression_score * 0.20
     )
-    score = _clamp(score)
+    return _clamp(score), adx_regime, tk_score, ema_score, progression_score
+
+
+def _score_structure(f: _Features, candles: np.ndarray) -> Dict:
+    """
+    Deterministic Structure score from regime/trend indicators.
+    Components: ADX regime, Ichimoku TK cross, EMA alignment, price progression.
+    """
+    adx = f.adx
+
+    score, adx_regime, tk_score, ema_score, progression_score = _str_kernel(
+        adx, f.macd_hist, f.ichimoku_tenkan, f.ichimoku_kijun,
+        f.ema_short, f.ema_medium, candles,
+    )
+    score, progression_score = float(score), float(progression_score)
+
+    components = {
+        'adx_regime': adx_regime,
+        'ichimoku_tk': tk_score,
+        'ema_alignment': ema_score,
+        'price_progression': progression_score,
+    }
 
     regime = ("trending up" if score > 0.2 else
               "trending down" if score < -0.2 else
               "range-bound/choppy")
-    note = (f"Structure: {regime}, ADX={adx:.0f}, "
-            f"TK {'bullish' if tk_score > 0 else 'bearish' if tk_score < 0 else 'flat'}, "
-            f"EMA {'aligned up' if ema_score > 0 else 'aligned down' if ema_score < 0 else 'flat'}")
+    note = ("Structure: {}, ADX={:.0f}, TK {}, EMA {}"
+            .format(regime, adx,
+                    'bullish' if tk_score > 0 else 'bearish' if tk_score < 0 else 'flat',
+                    'aligned up' if ema_score > 0 else 'aligned down' if ema_score < 0 else 'flat'))
 
     return {'score': round(score, 4), 'components': components, 'note': note}
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# INDICATOR SNAPSHOT (raw values handed to Layer 2)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# (snapshot key, source row, DB column, kind)
+#   source: 'ind' advanced_indicators, 'bas' basic_15m, 'fib' fibonacci_data
+#   kind:   'f' float via _num, 'i' int via _num, 's' raw value ('' if missing)
+_SNAPSHOT_SPEC = (
+    ('rsi_14',          'ind', 'rsi_14',                'f'),
+    ('macd_histogram',  'ind', 'macd_histogram_12_26',  'f'),
+    ('macd_line',       'ind', 'macd_line_12_26',       'f'),
+    ('macd_signal',     'ind', 'macd_signal_12_26',     'f'),
+    ('bb_pct',          'ind', 'bb_pct_20',             'f'),
+    ('bb_width',        'ind', 'bb_width_20',           'f'),
+    ('stoch_k',         'ind', 'stoch_k_14',            'f'),
+    ('stoch_d',         'ind', 'stoch_d_14',            'f'),
+    ('adx',             'ind', 'adx_14',                'f'),
+    ('cci',             'ind', 'cci_14',                'f'),
+    ('williams_r',      'ind', 'williams_r_14',         'f'),
+    ('sar_trend',       'ind', 'sar_trend',             's'),
+    ('ichimoku_tenkan', 'ind', 'ichimoku_tenkan',       'f'),
+    ('ichimoku_kijun',  'ind', 'ichimoku_kijun',        'f'),
+    ('ema_short',       'bas', 'ema_short',             'f'),
+    ('ema_medium',      'bas', 'ema_medium',            'f'),
+    ('ema_distance',    'bas', 'ema_distance',          'f'),
+    ('supertrend',      'bas', 'supertrend',            's'),
+    ('atr_14',          'bas', 'atr_14',                'f'),
+    ('atr_ratio',       'bas', 'atr_ratio',             'f'),
+    ('volume_ratio',    'ind', 'volume_ratio',          'f'),
+    ('fib_zone',        'fib', 'current_fib_zone',      's'),
+    ('in_golden_zone',  'fib', 'in_golden_zone',        'i'),
+)
+
+
+def _indicator_snapshot(sources: Dict[str, dict], candles: np.ndarray) -> Dict[str, Any]:
+    """Build indicator_snapshot from _SNAPSHOT_SPEC plus the latest candle."""
+    snapshot = {}
+    for key, src, col, kind in _SNAPSHOT_SPEC:
+        if kind == 's':
+            snapshot[key] = sources[src].get(col, '')
+        elif kind == 'i':
+            snapshot[key] = int(_num(sources[src].get(col), 0))
+        else:
+            snapshot[key] = _num(sources[src].get(col))
+
+    last = candles[0].tolist()
+    snapshot['last_close'] = last[C_CLOSE]
+    snapshot['last_open'] = last[C_OPEN]
+    snapshot['last_high'] = last[C_HIGH]
+    snapshot['last_low'] = last[C_LOW]
+    return snapshot
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # PUBLIC API
 # ═══════════════════════════════════════════════════════════════════════════
 
-def calculate_technical_scores(symbol: str) -> Optional[Dict]:
+# Upper-cased symbol -> intelligence DB path, resolved once at import
+_DB_PATHS = {k.upper(): v.get('db_path') for k, v in SYMBOL_DATABASES.items()}
+
+# symbol -> (data marker, last result). Reused until a new row lands in any
+# scored table; only the freshness fields are refreshed on a hit.
+_SCORE_CACHE: Dict[str, tuple] = {}
+_SCORE_LOCK = threading.Lock()
+
+# Past this age the feed is treated as dead/paused and no scores are
+# computed at all (results older than 1800 s are already flagged stale).
+_HARD_STALE_SECONDS = 3600
+
+
+def _with_freshness(result: Dict, freshness: float) -> Dict:
+    """Shallow copy of result with freshness_seconds / stale / summary set."""
+    stale = freshness > 1800
+    pa, kl = result['price_action'], result['key_levels']
+    mom, stru = result['momentum'], result['structure']
+    out = dict(result)
+    out['freshness_seconds'] = round(freshness, 0)
+    out['stale'] = stale
+    out['summary'] = (
+        f"L1 Deterministic: PA={pa['score']:+.3f} KL={kl['score']:+.3f} "
+        f"MOM={mom['score']:+.3f} STR={stru['score']:+.3f} "
+        f"({'STALE' if stale else f'{freshness:.0f}s ago'})"
+    )
+    return out
+
+
+def calculate_technical_scores(symbol: str, *, include_snapshot: bool = True) -> Optional[Dict]:
     """
     Calculate deterministic technical scores for all 4 vectors.
     Returns dict with price_action, key_levels, momentum, structure,
-    plus timestamp, freshness, stale flag, and indicator_snapshot for Layer 2.
+    plus timestamp, freshness, stale flag, and indicator_snapshot for Layer 2
+    (left out when include_snapshot is False).
+    If the newest bar is older than _HARD_STALE_SECONDS only timestamp,
+    freshness_seconds, stale (True) and summary are returned.
     """
-    symbol_upper = symbol.upper().replace('.SIM', '')
-    sym_config = SYMBOL_DATABASES.get(symbol_upper, {})
-    db_path = sym_config.get('db_path')
+    symbol_upper = symbol.upper().removesuffix('.SIM')
+    # Symbols registered after import fall back to the live config
+    db_path = (_DB_PATHS.get(symbol_upper)
+               or SYMBOL_DATABASES.get(symbol_upper, {}).get('db_path'))
 
     if not db_path:
         logger.error(f"No intelligence DB configured for symbol: {symbol_upper}")
         return None
 
+    marker = _data_marker(db_path)
+    if marker is not None:
+        latest_ts = marker[0]
+        age = _age_seconds(latest_ts)
+        if latest_ts is not None and age > _HARD_STALE_SECONDS:
+            # Skip the load and scoring; there is nothing current to score
+            return {
+                'timestamp': latest_ts,
+                'freshness_seconds': round(age, 0),
+                'stale': True,
+                'summary': f"L1 Deterministic: skipped (STALE, {age:.0f}s old)",
+            }
+
+        with _SCORE_LOCK:
+            cached = _SCORE_CACHE.get(symbol_upper)
+        # A cached result built without the snapshot can't serve a caller
+        # that wants one
+        if (cached is not None and cached[0] == marker
+                and (not include_snapshot or 'indicator_snapshot' in cached[1])):
+            out = _with_freshness(cached[1], _age_seconds(cached[1]['timestamp']))
+            if not include_snapshot:
+                out.pop('indicator_snapshot', None)
+            return out
+
     data = _load_latest(db_path, n_candles=5)
     if not data:
         return None
@@ -438,13 +851,11 @@ def calculate_technical_scores(symbol: str) -> Optional[Dict]:
     basic = data['basic']
     fib = data['fib']
 
-    pa = _score_price_action(candles, basic)
-    kl = _score_key_levels(indicators, basic, fib)
-    mom = _score_momentum(indicators, basic)
-    stru = _score_structure(indicators, basic, candles)
-
-    freshness = data['freshness_seconds']
-    stale = freshness > 1800
+    feats = _extract_features(indicators, basic, fib)
+    pa = _score_price_action(candles, feats)
+    kl = _score_key_levels(feats)
+    mom = _score_momentum(feats)
+    stru = _score_structure(feats, candles)
 
     result = {
         'price_action': pa,
@@ -452,45 +863,46 @@ def calculate_technical_scores(symbol: str) -> Optional[Dict]:
         'momentum': mom,
         'structure': stru,
         'timestamp': data['timestamp'],
-        'freshness_seconds': round(freshness, 0),
-        'stale': stale,
-        'summary': (
-            f"L1 Deterministic: PA={pa['score']:+.3f} KL={kl['score']:+.3f} "
-            f"MOM={mom['score']:+.3f} STR={stru['score']:+.3f} "
-            f"({'STALE' if stale else f'{freshness:.0f}s ago'})"
-        ),
-        'indicator_snapshot': {
-            'rsi_14': _safe(indicators.get('rsi_14')),
-            'macd_histogram': _safe(indicators.get('macd_histogram_12_26')),
-            'macd_line': _safe(indicators.get('macd_line_12_26')),
-            'macd_signal': _safe(indicators.get('macd_signal_12_26')),
-            'bb_pct': _safe(indicators.get('bb_pct_20')),
-            'bb_width': _safe(indicators.get('bb_width_20')),
-            'stoch_k': _safe(indicators.get('stoch_k_14')),
-            'stoch_d': _safe(indicators.get('stoch_d_14')),
-            'adx': _safe(indicators.get('adx_14')),
-            'cci': _safe(indicators.get('cci_14')),
-            'williams_r': _safe(indicators.get('williams_r_14')),
-            'sar_trend': indicators.get('sar_trend', ''),
-            'ichimoku_tenkan': _safe(indicators.get('ichimoku_tenkan')),
-            'ichimoku_kijun': _safe(indicators.get('ichimoku_kijun')),
-            'ema_short': _safe(basic.get('ema_short')),
-            'ema_medium': _safe(basic.get('ema_medium')),
-            'ema_distance': _safe(basic.get('ema_distance')),
-            'supertrend': basic.get('supertrend', ''),
-            'atr_14': _safe(basic.get('atr_14')),
-            'atr_ratio': _safe(basic.get('atr_ratio')),
-            'volume_ratio': _safe(indicators.get('volume_ratio')),
-            'fib_zone': fib.get('current_fib_zone', ''),
-            'in_golden_zone': int(_safe(fib.get('in_golden_zone'), 0)),
-            'last_close': _safe(candles[0].get('close')) if candles else 0,
-            'last_open': _safe(candles[0].get('open')) if candles else 0,
-            'last_high': _safe(candles[0].get('high')) if candles else 0,
-            'last_low': _safe(candles[0].get('low')) if candles else 0,
-        },
     }
+    if include_snapshot:
+        result['indicator_snapshot'] = _indicator_snapshot(
+            {'ind': indicators, 'bas': basic, 'fib': fib}, candles)
+
+    if marker is not None:
+        with _SCORE_LOCK:
+            _SCORE_CACHE[symbol_upper] = (marker, result)
+
+    return _with_freshness(result, data['freshness_seconds'])
+
+
+# Upper bound on symbols scored concurrently by the batch API
+_BATCH_WORKERS = 8
+
+
+def calculate_technical_scores_batch(symbols: Iterable[str], *,
+                                     include_snapshot: bool = True) -> Dict[str, Optional[Dict]]:
+    """
+    Score several symbols in one call. Returns {symbol: result-or-None},
+    keyed by the symbols as passed in. include_snapshot is passed through to
+    calculate_technical_scores.
+
+    Every symbol has its own intelligence DB and read lock, so the loads run
+    side by side on a small thread pool (sqlite3 releases the GIL while it
+    reads). Symbols that normalise to the same DB are scored once.
+    """
+    symbols = list(symbols)
+    unique = list(dict.fromkeys(s.upper().removesuffix('.SIM') for s in symbols))
+
+    def score(sym):
+        return calculate_technical_scores(sym, include_snapshot=include_snapshot)
+
+    if len(unique) <= 1:
+        scores = {sym: score(sym) for sym in unique}
+    else:
+        with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(unique))) as pool:
+            scores = dict(zip(unique, pool.map(score, unique)))
 
-    return result
+    return {sym: scores[sym.upper().removesuffix('.SIM')] for sym in symbols}
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -501,7 +913,8 @@ if __name__ == "__main__":
     import json
 
     symbol = sys.argv[1] if len(sys.argv) > 1 else "XAUJ26"
-    result = calculate_technical_scores(symbol)
+    # The CLI prints scores only; skip the Layer 2 snapshot
+    result = calculate_technical_scores(symbol, include_snapshot=False)
 
     if result:
         print(f"\n{'=' * 60}")
@@ -511,8 +924,11 @@ if __name__ == "__main__":
             print(f"  WARNING: DATA IS STALE (>1800s)")
         print(f"{'=' * 60}")
 
+        # A hard-stale result carries no vectors, only the summary
         for vec in ['price_action', 'key_levels', 'momentum', 'structure']:
-            v = result[vec]
+            v = result.get(vec)
+            if v is None:
+                continue
             emoji = '+' if v['score'] > 0.15 else ('-' if v['score'] < -0.15 else '~')
             print(f"\n  [{emoji}] {vec.upper()}: {v['score']:+.4f}")
             print(f"     {v['note']}")
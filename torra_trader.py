@@ -37,8 +37,11 @@ import json
 import time
 import base64
 import signal
+import sqlite3
 import logging
 import argparse
+import functools
+import io
 import re
 from datetime import datetime
 from typing import Optional, Dict
@@ -59,6 +62,13 @@ except ImportError:
     HAS_MSS = False
     print("[WARN] mss not installed: pip install mss")
 
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+    print("[WARN] Pillow not installed - screenshots sent as full-size PNG: pip install pillow")
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
 
@@ -112,6 +122,12 @@ DEFAULT_SIGNAL_PATH = os.path.join(
 
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 
+# Outermost {...} in a reply that wrapped its JSON in prose
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+
+# How often run_loop asks SQLite to refresh planner statistics
+DB_OPTIMIZE_INTERVAL = 15 * 60
+
 # ── Seed 24: Default screenshot regions for 3840×2140 native resolution ──
 # These are overridden by trading_config.screenshot_regions if present
 DEFAULT_SCREENSHOT_REGIONS = {
@@ -119,21 +135,32 @@ DEFAULT_SCREENSHOT_REGIONS = {
     "1h":  {"left": 1040, "top": 710, "width": 1840, "height": 500},
 }
 
+# Screenshots are downscaled to this long edge (Claude vision resizes
+# anything larger anyway) and sent as JPEG — a fraction of the PNG bytes to
+# encode, upload and tokenize. Without Pillow the raw PNG is sent.
+SCREENSHOT_MAX_EDGE = 1568
+SCREENSHOT_JPEG_QUALITY = 75
+SCREENSHOT_MEDIA_TYPE = "image/jpeg" if HAS_PIL else "image/png"
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SCREENSHOT — Seed 24: Per-timeframe mss capture
 # ═══════════════════════════════════════════════════════════════════════════
 
-def capture_screenshot(region=None) -> Optional[str]:
+def capture_screenshot(region=None) -> Optional[bytes]:
     """
-    Capture screen region → base64 PNG via mss.
+    Capture screen region → encoded image bytes via mss.
+
+    With Pillow the capture is downscaled to SCREENSHOT_MAX_EDGE and
+    encoded as JPEG; otherwise it is a full-size PNG. Either way the
+    encoding matches SCREENSHOT_MEDIA_TYPE.
     
     Args:
         region: tuple (left, top, width, height) in native pixels,
                 or None for full primary monitor
     
     Returns:
-        Base64-encoded PNG string, or None on failure
+        JPEG/PNG bytes (base64 is applied once, by the caller), or None on failure
     """
     if not HAS_MSS:
         return None
@@ -147,8 +174,17 @@ def capture_screenshot(region=None) -> Optional[str]:
             else:
                 monitor = sct.monitors[1]  # Primary monitor
             shot = sct.grab(monitor)
-            png = mss.tools.to_png(shot.rgb, shot.size)
-            return base64.standard_b64encode(png).decode("utf-8")
+
+            if not HAS_PIL:
+                return mss.tools.to_png(shot.rgb, shot.size)
+
+            img = Image.frombytes("RGB", shot.size, shot.rgb)
+            if max(img.size) > SCREENSHOT_MAX_EDGE:
+                resample = getattr(Image, 'Resampling', Image).LANCZOS
+                img.thumbnail((SCREENSHOT_MAX_EDGE, SCREENSHOT_MAX_EDGE), resample)
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=SCREENSHOT_JPEG_QUALITY, optimize=True)
+            return buf.getvalue()
     except Exception as e:
         logging.error(f"Screenshot failed: {e}")
         return None
@@ -182,14 +218,60 @@ def get_screenshot_region(trading_config: dict, timeframe: str) -> Optional[tupl
     return None  # Fullscreen fallback
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# INSTANCE DB TUNING
+# ═══════════════════════════════════════════════════════════════════════════
+
+def enable_wal(db_path: str) -> None:
+    """
+    Switch the instance DB to WAL so each tick's save_sentiment() write and
+    get_latest_sentiment() read don't block (or get blocked by) the UI and
+    sentiment_engine. journal_mode=WAL is stored in the file, so it applies
+    to every connection InstanceDatabaseManager opens afterwards.
+    """
+    if db_path == ":memory:" or db_path.startswith("file::memory:"):
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=5)
+        try:
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        finally:
+            conn.close()
+        if str(mode).lower() != "wal":
+            logging.warning(f"  [db] journal_mode is {mode}, WAL not enabled")
+    except sqlite3.Error as e:
+        logging.warning(f"  [db] Could not enable WAL on {db_path}: {e}")
+
+
+def optimize_db(db_path: str) -> None:
+    """Run PRAGMA optimize (refreshes stale planner stats; usually a no-op)."""
+    if db_path == ":memory:" or db_path.startswith("file::memory:"):
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA optimize=0x10002")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.warning(f"  [db] PRAGMA optimize failed: {e}")
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CLAUDE API — Returns 4 visual vectors (PA, KL, MOM, STR)
 # ═══════════════════════════════════════════════════════════════════════════
 
+@functools.lru_cache(maxsize=16)
+def _scoring_prompt(symbol: str, timeframe_label: str) -> str:
+    """build_scoring_prompt is pure in (symbol, timeframe) — the trader only
+    ever needs one prompt per timeframe, so build each once."""
+    return build_scoring_prompt(symbol, timeframe_label)
+
+
 def score_chart(client, image_b64: str, symbol: str, timeframe_label: str,
                 model: str = "claude-sonnet-4-20250514") -> Optional[Dict]:
     """Send screenshot to Claude → 4 visual vector scores + composite_bias gut."""
-    prompt = build_scoring_prompt(symbol, timeframe_label)
+    prompt = _scoring_prompt(symbol, timeframe_label)
 
     try:
         resp = client.messages.create(
@@ -200,23 +282,27 @@ def score_chart(client, image_b64: str, symbol: str, timeframe_label: str,
                 "role": "user",
                 "content": [
                     {"type": "image",
-                     "source": {"type": "base64", "media_type": "image/png", "data": image_b64}},
+                     "source": {"type": "base64", "media_type": SCREENSHOT_MEDIA_TYPE, "data": image_b64}},
                     {"type": "text", "text": prompt}
                 ]
             }]
         )
         raw = resp.content[0].text.strip()
         
-        # Strip markdown code fences if present
-        clean = re.sub(r'^```(?:json)?\s*', '', raw)
-        clean = re.sub(r'\s*```\s*$', '', clean)
+        # Strip markdown code fences if present (plain string ops — raw is
+        # already stripped, so the fences can only sit at the very ends)
+        clean = raw
+        if clean.startswith('```'):
+            clean = clean[3:].removeprefix('json').lstrip()
+        if clean.endswith('```'):
+            clean = clean[:-3].rstrip()
 
         # Try to extract JSON even if Claude returned prose around it
         try:
             return json.loads(clean)
         except json.JSONDecodeError:
             # Try to find JSON object within the response
-            match = re.search(r'\{[\s\S]*\}', clean)
+            match = _JSON_OBJECT_RE.search(clean)
             if match:
                 try:
                     return json.loads(match.group())
@@ -392,6 +478,9 @@ class TorraTrader:
         # ── Database ──
         db_path = db_path or os.path.join(BASE_DIR, "apex_instances.db")
         self.db = get_instance_db(db_path)
+        self.db_path = self.db.db_path
+        enable_wal(self.db_path)
+        self._last_optimize = time.time()
 
         # ── Load & validate instance + profile ──
         self.instance = self.db.get_instance(instance_id)
@@ -563,7 +652,6 @@ class TorraTrader:
             return
 
         # ── 1. Chart Capture — Seed 24: Per-timeframe mss region ──
-        image_b64 = None
         region = get_screenshot_region(self.tc, timeframe)
 
         if region:
@@ -572,17 +660,20 @@ class TorraTrader:
         else:
             print(f"  [capture] {timeframe} chart via mss (fullscreen — no region configured)")
 
-        image_b64 = capture_screenshot(region)
+        image_bytes = capture_screenshot(region)
 
-        if not image_b64:
+        if not image_bytes:
             logging.error(f"  [capture] mss capture failed -> skipping tick")
             elapsed_ms = 0
             self._save_error_row(timeframe, now_iso, elapsed_ms, "CAPTURE_ERROR")
             return
 
-        size_kb = len(image_b64) // 1024
+        size_kb = len(image_bytes) // 1024
         print(f"  [capture] Chart captured ({size_kb}KB) via mss {'region' if region else 'fullscreen'}")
 
+        # Base64 once, shared by score_chart and the agent debate (ASCII output)
+        image_b64 = base64.b64encode(image_bytes).decode("ascii")
+
         # ── 2. Scoring: Base (Claude visual) + Agent Adjustments (Seed 22) ──
         start = time.time()
         agent_deliberation = None
@@ -609,6 +700,7 @@ class TorraTrader:
                     "symbol": self.symbol,
                     "timeframe_label": tf_label,
                     "screenshot_b64": image_b64,
+                    "screenshot_media_type": SCREENSHOT_MEDIA_TYPE,
                     "l1_scores": {
                         "price_action": pa,
                         "key_levels": kl,
@@ -866,6 +958,10 @@ class TorraTrader:
                         print(f"  1h tick error: {e} — trader continues")
                     did_something = True
 
+                if time.time() - self._last_optimize >= DB_OPTIMIZE_INTERVAL:
+                    optimize_db(self.db_path)
+                    self._last_optimize = time.time()
+
                 if not did_something:
                     now = datetime.now()
                     if now.second < 10 and now.minute % 5 == 0:
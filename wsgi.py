@@ -0,0 +1,19 @@
+"""
+WSGI ENTRY POINT - MULTI-WORKER API SERVER
+For gunicorn (Linux) instead of `python startapp.py`:
+
+    gunicorn -w 2 -k gthread --threads 8 --preload -b 0.0.0.0:5000 wsgi:app
+
+gthread rather than gevent: the SQLite/MT5 C extensions aren't monkeypatch-safe.
+--preload imports this module once in the master, so the startup checks and
+index creation run once instead of per worker (the /api/status refresher
+thread does not survive the fork; each worker starts its own on its first
+/api/status request). Collectors are NOT started
+here - forked workers would each open their own MT5 connection and write the
+same bars. Run collection in a single separate process (python startapp.py,
+or mt5_multi_collector.py) and let the workers serve reads.
+"""
+
+from startapp import app, startup_checks
+
+startup_checks(start_collectors=False)